@@ -0,0 +1,179 @@
+import io
+import zipfile
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+
+from recruitment.backend_code.job_offer.job_offer import (
+    get_job_offer_pdf_filename,
+    get_job_offer_render,
+    send_email_with_attachment,
+)
+from recruitment.backend_code.pdf_render.pdf_render import get_pdf_render_queue
+from recruitment.permission.permission import check_permitted_names
+
+BULK_JOB_OFFER_EVENT = "recruitment_bulk_job_offer"
+BULK_JOB_OFFER_KEY = "recruitment_bulk_job_offer"
+
+# Offers per queued job; chunks run in parallel on the PDF queue workers
+BULK_JOB_OFFER_CHUNK_SIZE = 10
+MAX_BULK_JOB_OFFERS = 500
+BULK_JOB_OFFER_TTL = 24 * 60 * 60
+
+
+def get_run_key(run_id, suffix=""):
+    return f"{BULK_JOB_OFFER_KEY}:{run_id}{suffix}"
+
+
+@frappe.whitelist()
+def bulk_generate_job_offers(docnames, send_email=0):
+    """
+    Renders the offer PDFs of the selected Job Offers in chunks on the PDF queue
+    and optionally mails each one to its applicant. Returns the run id; progress
+    is pushed over realtime and a ZIP of all PDFs is attached when the run ends.
+    """
+    docnames = list(dict.fromkeys(frappe.parse_json(docnames) or []))
+    if not docnames:
+        frappe.throw(_("Please select at least one Job Offer"))
+    if len(docnames) > MAX_BULK_JOB_OFFERS:
+        frappe.throw(
+            _("You can generate at most {0} Job Offers at once").format(
+                MAX_BULK_JOB_OFFERS
+            )
+        )
+    check_permitted_names("Job Offer", docnames)
+
+    run_id = frappe.generate_hash(length=12)
+    frappe.cache().set_value(
+        get_run_key(run_id),
+        {
+            "total": len(docnames),
+            "docnames": docnames,
+            "send_email": cint(send_email),
+            "user": frappe.session.user,
+            "file_url": None,
+        },
+        expires_in_sec=BULK_JOB_OFFER_TTL,
+    )
+    for start in range(0, len(docnames), BULK_JOB_OFFER_CHUNK_SIZE):
+        frappe.enqueue(
+            process_bulk_job_offer_chunk,
+            queue=get_pdf_render_queue(),
+            timeout=1500,
+            enqueue_after_commit=True,
+            run_id=run_id,
+            docnames=docnames[start : start + BULK_JOB_OFFER_CHUNK_SIZE],
+        )
+    return {"run_id": run_id, "total": len(docnames)}
+
+
+def process_bulk_job_offer_chunk(run_id, docnames):
+    """Renders (and mails) one chunk of a bulk run, isolating failures per offer."""
+    run = frappe.cache().get_value(get_run_key(run_id))
+    if not run:
+        return
+
+    cache = frappe.cache()
+    processed_key = cache.make_key(get_run_key(run_id, ":processed"))
+    # Salary Structures and breakdowns are shared by the offers of the chunk
+    salary_cache = {}
+    for docname in docnames:
+        try:
+            job_offer_doc = frappe.get_doc("Job Offer", docname)
+            pdf = get_job_offer_render(
+                job_offer_doc, "Download Job Offer", salary_cache=salary_cache
+            )
+            if run["send_email"] and job_offer_doc.applicant_email:
+                send_email_with_attachment(job_offer_doc.applicant_email, pdf)
+            frappe.db.commit()
+        except Exception:
+            frappe.db.rollback()
+            frappe.log_error(frappe.get_traceback(), "Bulk Job Offer Error")
+            cache.rpush(get_run_key(run_id, ":failed"), docname)
+            cache.expire(cache.make_key(get_run_key(run_id, ":failed")), BULK_JOB_OFFER_TTL)
+
+        processed = cache.incr(processed_key)
+        cache.expire(processed_key, BULK_JOB_OFFER_TTL)
+        frappe.publish_realtime(
+            BULK_JOB_OFFER_EVENT,
+            {"run_id": run_id, "processed": processed, "total": run["total"]},
+            user=run["user"],
+        )
+        if processed == run["total"]:
+            finish_bulk_job_offer_run(run_id, run)
+
+
+def get_failed_job_offers(run_id):
+    return [
+        frappe.safe_decode(docname)
+        for docname in frappe.cache().lrange(get_run_key(run_id, ":failed"), 0, -1)
+    ]
+
+
+def finish_bulk_job_offer_run(run_id, run):
+    """Zips the rendered PDFs of a finished run and notifies the user."""
+    failed = set(get_failed_job_offers(run_id))
+    buffer = io.BytesIO()
+    filenames = set()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for docname in run["docnames"]:
+            if docname in failed:
+                continue
+            job_offer_doc = frappe.get_doc("Job Offer", docname)
+            pdf = get_job_offer_render(job_offer_doc, "Download Job Offer", cached_only=True)
+            if pdf is None:
+                continue
+            filename = get_job_offer_pdf_filename(job_offer_doc)
+            if filename in filenames:
+                filename = f"{docname}_{filename}"
+            filenames.add(filename)
+            archive.writestr(filename, pdf)
+
+    zip_file = frappe.get_doc(
+        {
+            "doctype": "File",
+            "file_name": f"job_offers_{run_id}.zip",
+            "is_private": 1,
+            "content": buffer.getvalue(),
+        }
+    )
+    zip_file.owner = run["user"]
+    zip_file.insert(ignore_permissions=True)
+    frappe.db.commit()
+
+    run["file_url"] = zip_file.file_url
+    frappe.cache().set_value(
+        get_run_key(run_id), run, expires_in_sec=BULK_JOB_OFFER_TTL
+    )
+    frappe.publish_realtime(
+        BULK_JOB_OFFER_EVENT,
+        {
+            "run_id": run_id,
+            "processed": run["total"],
+            "total": run["total"],
+            "completed": True,
+            "file_url": zip_file.file_url,
+            "failed": sorted(failed),
+        },
+        user=run["user"],
+    )
+
+
+@frappe.whitelist()
+def get_bulk_job_offer_progress(run_id):
+    """Progress of a bulk run, for clients that missed the realtime events."""
+    run = frappe.cache().get_value(get_run_key(run_id))
+    if not run or run["user"] != frappe.session.user:
+        frappe.throw(_("Bulk Job Offer run {0} not found").format(run_id))
+    processed = frappe.safe_decode(
+        frappe.cache().get(frappe.cache().make_key(get_run_key(run_id, ":processed")))
+    )
+    return {
+        "run_id": run_id,
+        "total": run["total"],
+        "processed": cint(processed),
+        "completed": bool(run["file_url"]),
+        "file_url": run["file_url"],
+        "failed": get_failed_job_offers(run_id),
+    }
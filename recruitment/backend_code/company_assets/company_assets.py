@@ -0,0 +1,58 @@
+import base64
+import io
+import os
+
+import frappe
+from PIL import Image
+
+# Image prefix in public/images for each hiring company
+COMPANY_ASSET_KEYS = {
+    "Mefron Technologies (India) Private Limited": "mefron",
+    "Mantra Softech (India) Private Limited": "mantra",
+    "Mitras Global Private Limited": "mitras",
+    "Mocula Optics Technologies Private Limited": "mocula",
+    "Mantra Smart Identity Private Limited": "mantra_identity",
+    "Mivanta India Private Limited": "mivanta",
+}
+
+# Data URIs live in worker memory, keyed by image file name
+_image_data_uris = {}
+
+
+def optimize_png(content):
+    """Losslessly recompresses a PNG, keeping the original if it is not smaller."""
+    try:
+        image = Image.open(io.BytesIO(content))
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", optimize=True)
+    except Exception:
+        return content
+    optimized = buffer.getvalue()
+    return optimized if len(optimized) < len(content) else content
+
+
+def get_image_data_uri(file_name):
+    """
+    Data URI of an image in public/images, optimized and encoded once per worker
+    (again after the file changes), so PDFs embed it instead of fetching it.
+    """
+    path = frappe.get_app_path("recruitment", "public", "images", file_name)
+    if not os.path.exists(path):
+        return None
+
+    mtime = os.path.getmtime(path)
+    cached = _image_data_uris.get(file_name)
+    if not cached or cached[0] != mtime:
+        with open(path, "rb") as f:
+            content = optimize_png(f.read())
+        data_uri = "data:image/png;base64," + base64.b64encode(content).decode()
+        cached = _image_data_uris[file_name] = (mtime, data_uri)
+    return cached[1]
+
+
+def get_company_image(asset_key, part, alt):
+    """`<img>` tag with the inlined header or footer of a company, or ""."""
+    data_uri = get_image_data_uri(f"{asset_key}_{part}.png") if asset_key else None
+    if not data_uri:
+        return ""
+    return f'<img src="{data_uri}" width="100%" alt="{alt}"/>'
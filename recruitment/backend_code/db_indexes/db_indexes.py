@@ -0,0 +1,164 @@
+import frappe
+
+# Composite indexes behind the app's hot filters, as (doctype, index name, columns).
+# Column order matters: equality filters first, then the range/sort column.
+RECRUITMENT_INDEXES = (
+    # Scheduled status mails, every 10 minutes
+    (
+        "Job Applicant",
+        "recruitment_email_schedule",
+        ("custom_email_status", "custom_email_scheduled_time"),
+    ),
+    (
+        "Job Offer",
+        "recruitment_email_schedule",
+        ("custom_email_status", "custom_email_schedule_time"),
+    ),
+    # Joining reminders and approved offer counts
+    ("Job Offer", "recruitment_joining", ("workflow_state", "custom_date_of_joining")),
+    ("Job Offer", "recruitment_workflow_creation", ("workflow_state", "creation")),
+    # Recruiter metrics and owner-scoped lists
+    ("Job Applicant", "recruitment_owner_creation", ("owner", "creation")),
+    ("Job Offer", "recruitment_owner_creation", ("owner", "creation")),
+    ("Interview", "recruitment_owner_creation", ("owner", "creation")),
+    # Open applicant digest
+    ("Job Applicant", "recruitment_opening_status", ("job_title", "status", "creation")),
+    # Pending interviews and their feedback
+    ("Interview", "recruitment_status", ("status", "interview_round")),
+    ("Interview Detail", "recruitment_interviewer", ("interviewer", "parent")),
+    ("Interview Feedback", "recruitment_interview_interviewer", ("interview", "interviewer")),
+    # Cached Job Offer renders are found by file name
+    ("File", "recruitment_file_name", ("file_name",)),
+    # Duplicate checks on validate probe the dedupe hash and bucket
+    ("Job Applicant", "recruitment_dedupe", ("custom_dedupe_hash", "custom_dedupe_bucket")),
+    ("Job Opening", "recruitment_dedupe", ("custom_dedupe_hash", "custom_dedupe_bucket")),
+    ("Job Requisition", "recruitment_dedupe", ("custom_dedupe_hash", "custom_dedupe_bucket")),
+)
+
+# Indexes the app no longer needs, dropped on migrate
+RETIRED_INDEXES = (
+    ("Job Applicant", "recruitment_duplicate"),
+    ("Job Opening", "recruitment_duplicate"),
+    ("Job Requisition", "recruitment_duplicate"),
+)
+
+# Representative queries of the hot paths, checked by `bench recruitment-explain`
+EXPLAIN_QUERIES = {
+    "Job Applicant scheduled emails": """
+        SELECT name FROM `tabJob Applicant`
+        WHERE custom_email_status = 'Pending' AND custom_email_scheduled_time <= NOW()
+        ORDER BY custom_email_scheduled_time LIMIT 200
+    """,
+    "Job Offer scheduled emails": """
+        SELECT name FROM `tabJob Offer`
+        WHERE custom_email_status = 'Pending' AND custom_email_schedule_time <= NOW()
+        ORDER BY custom_email_schedule_time LIMIT 200
+    """,
+    "Joining reminders": """
+        SELECT name FROM `tabJob Offer`
+        WHERE workflow_state = 'Offer Accepted' AND custom_date_of_joining = CURDATE()
+    """,
+    "Recruiter applicants per day": """
+        SELECT owner, COUNT(*) FROM `tabJob Applicant`
+        WHERE owner = 'Administrator' AND creation >= CURDATE() - INTERVAL 1 DAY
+        GROUP BY owner
+    """,
+    "Open applicant digest": """
+        SELECT ja.name FROM `tabJob Opening` jo
+        INNER JOIN `tabJob Applicant` ja ON ja.job_title = jo.name
+        WHERE jo.status = 'Open' AND ja.status = 'Profile Under Review'
+            AND ja.creation >= CURDATE() - INTERVAL 7 DAY
+    """,
+    "Pending interview feedback": """
+        SELECT idt.interviewer, i.name FROM `tabInterview` i
+        INNER JOIN `tabInterview Detail` idt ON idt.parent = i.name
+        LEFT JOIN `tabInterview Feedback` f
+            ON f.interview = i.name AND f.interviewer = idt.interviewer
+        WHERE i.status = 'Pending' AND f.name IS NULL
+    """,
+    "Job Offer render cache": """
+        SELECT name FROM `tabFile`
+        WHERE file_name LIKE 'job-offer-render-x-%' AND is_private = 1
+    """,
+    "Job Applicant duplicate check": """
+        SELECT name, custom_dedupe_bucket, custom_dedupe_key FROM `tabJob Applicant`
+        WHERE custom_dedupe_hash = 'x' AND name != 'x'
+    """,
+    "Job Opening duplicate check": """
+        SELECT name, custom_dedupe_bucket, custom_dedupe_key FROM `tabJob Opening`
+        WHERE custom_dedupe_hash = 'x' AND name != 'x'
+    """,
+    "Job Requisition duplicate check": """
+        SELECT name, custom_dedupe_bucket, custom_dedupe_key FROM `tabJob Requisition`
+        WHERE custom_dedupe_hash = 'x' AND name != 'x'
+    """,
+}
+
+
+def get_index_columns(doctype, index_name):
+    """Columns of an existing index in order, or None if it does not exist."""
+    rows = frappe.db.sql(
+        f"SHOW INDEX FROM `tab{doctype}` WHERE Key_name = %s", index_name, as_dict=True
+    )
+    if not rows:
+        return None
+    return tuple(row.Column_name for row in sorted(rows, key=lambda row: row.Seq_in_index))
+
+
+def apply_indexes():
+    """
+    Creates every index in RECRUITMENT_INDEXES that is missing or out of date
+    and drops RETIRED_INDEXES (after_migrate). Indexes whose columns do not
+    exist yet are skipped.
+    """
+    for doctype, index_name in RETIRED_INDEXES:
+        try:
+            if frappe.db.table_exists(doctype) and get_index_columns(doctype, index_name):
+                frappe.db.sql_ddl(f"ALTER TABLE `tab{doctype}` DROP INDEX `{index_name}`")
+        except Exception:
+            frappe.log_error(frappe.get_traceback(), "Recruitment Index Error")
+
+    for doctype, index_name, columns in RECRUITMENT_INDEXES:
+        try:
+            if not frappe.db.table_exists(doctype) or not all(
+                frappe.db.has_column(doctype, column) for column in columns
+            ):
+                continue
+
+            existing = get_index_columns(doctype, index_name)
+            if existing == columns:
+                continue
+            if existing:
+                frappe.db.sql_ddl(f"ALTER TABLE `tab{doctype}` DROP INDEX `{index_name}`")
+            frappe.db.add_index(doctype, list(columns), index_name)
+
+            if get_index_columns(doctype, index_name) != columns:
+                frappe.log_error(
+                    f"Index {index_name} on {doctype} was not created with columns {columns}",
+                    "Recruitment Index Error",
+                )
+        except Exception:
+            frappe.log_error(frappe.get_traceback(), "Recruitment Index Error")
+
+
+def explain_known_queries():
+    """
+    Runs EXPLAIN on EXPLAIN_QUERIES and returns the full table or index scans
+    found, as {query name: [{"table", "type", "rows"}]}. Queries that fail to
+    explain (e.g. a missing column) are reported with their error.
+    """
+    report = {}
+    for name, query in EXPLAIN_QUERIES.items():
+        try:
+            plan = frappe.db.sql(f"EXPLAIN {query}", as_dict=True)
+        except Exception as e:
+            report[name] = [{"error": str(e)}]
+            continue
+        scans = [
+            {"table": row.table, "type": row.type, "rows": row.rows}
+            for row in plan
+            if row.type in ("ALL", "index")
+        ]
+        if scans:
+            report[name] = scans
+    return report
@@ -0,0 +1,176 @@
+import hashlib
+
+import frappe
+
+# Duplicate rules per doctype: the fields that identify a record and the status
+# buckets. Existing "Active" records block a new duplicate, "Closed" ones only
+# warn. Doctypes without a status rule are always "Active".
+DEDUPE_RULES = {
+    "Job Applicant": {
+        "fields": (
+            "email_id",
+            "designation",
+            "custom_department",
+            "custom_hiring_company",
+            "job_title",
+        ),
+        "active_statuses": (
+            "Draft",
+            "Send to Team Leader",
+            "Profile Under Review",
+            "Shortlisted",
+            "R1 Selected",
+            "R2 Selected",
+            "R3 Selected",
+            "Offer Released",
+            "Offer Accepted",
+            "Joined",
+        ),
+        "closed_statuses": (
+            "Not Shortlisted",
+            "R1 Rejected",
+            "R2 Rejected",
+            "R3 Rejected",
+            "Final Rejected",
+            "No Show",
+            "Candidate Backed Out",
+        ),
+    },
+    "Job Opening": {
+        "fields": (
+            "designation",
+            "department",
+            "custom_requisition_type",
+            "custom_hiring_company",
+        ),
+    },
+    "Job Requisition": {
+        "fields": (
+            "designation",
+            "department",
+            "custom_requisition_type",
+            "custom_hiring_company",
+        ),
+        "closed_statuses": ("Cancelled", "Filled"),
+    },
+}
+
+ACTIVE_BUCKET = "Active"
+CLOSED_BUCKET = "Closed"
+OTHER_BUCKET = "Other"
+
+
+def get_dedupe_hash(doctype, values):
+    """sha1 of the lower-cased, trimmed identifying fields of a record."""
+    normalized = "\x1f".join(
+        (values.get(fieldname) or "").strip().lower()
+        for fieldname in DEDUPE_RULES[doctype]["fields"]
+    )
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def get_dedupe_bucket(doctype, status):
+    rule = DEDUPE_RULES[doctype]
+    if status in rule.get("closed_statuses", ()):
+        return CLOSED_BUCKET
+    if "active_statuses" not in rule or status in rule["active_statuses"]:
+        return ACTIVE_BUCKET
+    return OTHER_BUCKET
+
+
+def find_duplicates(doctype, dedupe_hash, name=None):
+    """
+    Records sharing a dedupe hash, from one probe of the (hash, bucket) index.
+    Returns {"hard": [...], "soft": [...], "key_holder": name or None}, where
+    key_holder is the record that owns the unique dedupe key.
+    """
+    rows = frappe.db.sql(
+        f"""
+        SELECT name, custom_dedupe_bucket, custom_dedupe_key
+        FROM `tab{doctype}`
+        WHERE custom_dedupe_hash = %(dedupe_hash)s
+        AND name != %(name)s
+        """,
+        {"dedupe_hash": dedupe_hash, "name": name or ""},
+        as_dict=True,
+    )
+    return {
+        "hard": [row.name for row in rows if row.custom_dedupe_bucket == ACTIVE_BUCKET],
+        "soft": [row.name for row in rows if row.custom_dedupe_bucket == CLOSED_BUCKET],
+        "key_holder": next(
+            (row.name for row in rows if row.custom_dedupe_key == dedupe_hash), None
+        ),
+    }
+
+
+def apply_dedupe_key(doc):
+    """
+    Sets the dedupe hash, bucket and unique key of a document being saved and
+    returns its duplicates. Only an active record owns the unique key, so the
+    database rejects a second active duplicate even if two saves race.
+    """
+    dedupe_hash = get_dedupe_hash(doc.doctype, doc)
+    duplicates = find_duplicates(
+        doc.doctype, dedupe_hash, None if doc.is_new() else doc.name
+    )
+    doc.custom_dedupe_hash = dedupe_hash
+    doc.custom_dedupe_bucket = get_dedupe_bucket(doc.doctype, doc.get("status"))
+    # Duplicates saved before the key existed keep an empty key
+    doc.custom_dedupe_key = (
+        dedupe_hash
+        if doc.custom_dedupe_bucket == ACTIVE_BUCKET and not duplicates["key_holder"]
+        else None
+    )
+    return duplicates
+
+
+def refresh_dedupe_key(doctype, name):
+    """Re-buckets a record whose status was changed without saving it."""
+    status = frappe.db.get_value(doctype, name, "status")
+    bucket = get_dedupe_bucket(doctype, status)
+    values = {"custom_dedupe_bucket": bucket}
+    if bucket != ACTIVE_BUCKET:
+        values["custom_dedupe_key"] = None
+    frappe.db.set_value(doctype, name, values, update_modified=False)
+
+
+@frappe.whitelist()
+def get_job_applicant_duplicates(doc):
+    """Hard-block and soft-warn duplicates of an unsaved Job Applicant, in one call."""
+    frappe.has_permission("Job Applicant", "read", throw=True)
+    values = frappe.parse_json(doc)
+    duplicates = find_duplicates(
+        "Job Applicant",
+        get_dedupe_hash("Job Applicant", values),
+        None if values.get("__islocal") else values.get("name"),
+    )
+    return {"hard": duplicates["hard"], "soft": duplicates["soft"]}
+
+
+def populate_dedupe_keys(doctype):
+    """
+    Backfills the dedupe columns of every record. The oldest active record of
+    each duplicate group gets the unique key; later ones keep it empty.
+    """
+    rule = DEDUPE_RULES[doctype]
+    rows = frappe.get_all(
+        doctype,
+        fields=["name", "status", *rule["fields"]],
+        order_by="creation asc",
+    )
+    key_holders = set()
+    updates = {}
+    for row in rows:
+        dedupe_hash = get_dedupe_hash(doctype, row)
+        bucket = get_dedupe_bucket(doctype, row.get("status"))
+        dedupe_key = None
+        if bucket == ACTIVE_BUCKET and dedupe_hash not in key_holders:
+            key_holders.add(dedupe_hash)
+            dedupe_key = dedupe_hash
+        updates[row.name] = {
+            "custom_dedupe_hash": dedupe_hash,
+            "custom_dedupe_bucket": bucket,
+            "custom_dedupe_key": dedupe_key,
+        }
+    if updates:
+        frappe.db.bulk_update(doctype, updates, update_modified=False)
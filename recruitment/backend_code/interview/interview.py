@@ -1,18 +1,23 @@
 import frappe
 from frappe.utils import cint, flt, fmt_money
-from frappe.utils.pdf import get_pdf
+from frappe.utils.file_manager import save_file
 from frappe.model.document import Document
 from frappe.email.queue import flush
 from frappe import _
-import base64
 import ast
 from frappe.www.printview import get_print_style
 from datetime import datetime
 from frappe.utils import cint, cstr, get_datetime, get_link_to_form, getdate, nowtime
+from recruitment.backend_code.outbound_mail.outbound_mail import send_mail
+from recruitment.backend_code.pdf_render.pdf_render import (
+    enqueue_pdf_render,
+    render_pdf,
+)
+from recruitment.backend_code.template_registry.template_registry import render_template
 
 
-@frappe.whitelist()
-def make_interview_evaluation_form(source_name):
+def get_interview_evaluation_pdf(source_name):
+    """Renders the interview evaluation form of an Interview as PDF bytes."""
     # Get the Interview document
     interview_doc = frappe.get_doc("Interview", source_name)
 
@@ -35,17 +40,51 @@ def make_interview_evaluation_form(source_name):
         "schedule_date": final_schedule_date,
     }
     # Render the template using the context
-    html = frappe.render_template(
+    html = render_template(
         "recruitment/public/js/templates/interview.html", context
     )
 
     # Generate the PDF from the rendered HTML
-    pdf_data = get_pdf(html)
+    return render_pdf(html)
 
-    # Encode the PDF in Base64 for return
-    pdf_base64 = base64.b64encode(pdf_data).decode("utf-8")
 
-    return pdf_base64
+@frappe.whitelist()
+def enqueue_interview_evaluation_form(source_name):
+    """
+    Renders the interview evaluation form on the PDF queue. The form is notified
+    over realtime with the URL of the private file once it is attached.
+    """
+    frappe.get_doc("Interview", source_name).check_permission("read")
+    job_id = enqueue_pdf_render(
+        "recruitment.backend_code.interview.interview.attach_interview_evaluation_form",
+        f"interview_evaluation_form::{source_name}",
+        source_name=source_name,
+    )
+    return {"status": "Queued", "job_id": job_id}
+
+
+def attach_interview_evaluation_form(source_name):
+    """PDF queue job that attaches the evaluation form to the Interview."""
+    file_name = f"interview_feedback_{source_name}.pdf"
+    for existing in frappe.get_all(
+        "File",
+        filters={
+            "attached_to_doctype": "Interview",
+            "attached_to_name": source_name,
+            "file_name": file_name,
+        },
+        pluck="name",
+    ):
+        frappe.delete_doc("File", existing, ignore_permissions=True)
+
+    saved_file = save_file(
+        file_name,
+        get_interview_evaluation_pdf(source_name),
+        "Interview",
+        source_name,
+        is_private=1,
+    )
+    return {"file_url": saved_file.file_url, "file_name": file_name}
 
 
 @frappe.whitelist()
@@ -139,8 +178,11 @@ def send_interview_feedback_notification(doc, method):
     <p>Regards,<br>HR Team</p>
         """
     # Send email
-    frappe.sendmail(
-        recipients=[interview.owner], subject=subject, message=message, now=True
+    send_mail(
+        "Interview Feedback Submitted",
+        recipients=[interview.owner],
+        subject=subject,
+        message=message,
     )
 
 
@@ -191,11 +233,11 @@ def send_interview_cancellation_notification(docname):
     recipients = [applicant_email] + interviewer_emails
 
     # Send email
-    frappe.sendmail(
+    send_mail(
+        "Interview Cancellation",
         recipients=recipients,  # Send to applicant and all interviewers
         subject=subject,
         message=message,
-        now=True,
     )
     interview.submit()
     interview.cancel()
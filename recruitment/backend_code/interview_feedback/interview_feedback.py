@@ -0,0 +1,117 @@
+import frappe
+from frappe import _
+
+
+def get_feedback_status(interviews):
+    """
+    Recorded and missing interviewers of one or many interviews, from a single
+    grouped query. Feedback is recorded when it matches the interview,
+    interviewer, round and applicant and is not cancelled; drafts count, as the
+    interviewer has already filled it in.
+
+    Returns {interview: {"recorded": set, "missing": set, "full_names": dict}}.
+    """
+    if isinstance(interviews, str):
+        interviews = [interviews]
+    interviews = list(dict.fromkeys(interviews or []))
+    if not interviews:
+        return {}
+
+    rows = frappe.db.sql(
+        """
+        SELECT
+            idt.parent AS interview,
+            idt.interviewer,
+            u.full_name,
+            MAX(f.name IS NOT NULL) AS recorded
+        FROM `tabInterview Detail` idt
+        INNER JOIN `tabInterview` i ON i.name = idt.parent
+        LEFT JOIN `tabUser` u ON u.name = idt.interviewer
+        LEFT JOIN `tabInterview Feedback` f
+            ON f.interview = i.name
+            AND f.interviewer = idt.interviewer
+            AND f.interview_round = i.interview_round
+            AND f.job_applicant = i.job_applicant
+            AND f.docstatus != 2
+        WHERE idt.parenttype = 'Interview'
+            AND idt.parentfield = 'interview_details'
+            AND idt.parent IN %(interviews)s
+            AND IFNULL(idt.interviewer, '') != ''
+        GROUP BY idt.parent, idt.interviewer, u.full_name
+        """,
+        {"interviews": interviews},
+        as_dict=True,
+    )
+
+    status = {
+        interview: {"recorded": set(), "missing": set(), "full_names": {}}
+        for interview in interviews
+    }
+    for row in rows:
+        interview_status = status[row.interview]
+        interview_status["recorded" if row.recorded else "missing"].add(row.interviewer)
+        interview_status["full_names"][row.interviewer] = row.full_name or row.interviewer
+    return status
+
+
+@frappe.whitelist()
+def get_interview_feedback_status(interview):
+    """Feedback status of one interview for the Interview form."""
+    frappe.has_permission("Interview", "read", doc=interview, throw=True)
+    status = get_feedback_status(interview)[interview]
+    return {
+        "recorded": sorted(status["recorded"]),
+        "missing": sorted(status["missing"]),
+    }
+
+
+def validate_feedback_complete(interview):
+    """Throws with the names of the interviewers whose feedback is still missing."""
+    status = get_feedback_status(interview)[interview]
+    if status["missing"]:
+        frappe.throw(
+            _("Interview Feedback is remaining from Interviewer {0}").format(
+                ", ".join(
+                    sorted(status["full_names"][interviewer] for interviewer in status["missing"])
+                )
+            )
+        )
+
+
+def get_pending_feedback():
+    """
+    Every (interviewer, pending interview) pair still missing feedback, from one
+    anti-join over Interview, Interview Detail and Interview Feedback, ordered by
+    interviewer so callers can group it into one digest per interviewer.
+    """
+    return frappe.db.sql(
+        """
+        SELECT DISTINCT
+            idt.interviewer,
+            u.full_name,
+            i.name AS interview,
+            i.interview_round,
+            i.job_applicant,
+            ja.applicant_name,
+            i.scheduled_on
+        FROM `tabInterview` i
+        INNER JOIN `tabInterview Detail` idt
+            ON idt.parent = i.name
+            AND idt.parenttype = 'Interview'
+            AND idt.parentfield = 'interview_details'
+        LEFT JOIN `tabUser` u ON u.name = idt.interviewer
+        LEFT JOIN `tabJob Applicant` ja ON ja.name = i.job_applicant
+        LEFT JOIN `tabInterview Feedback` f
+            ON f.interview = i.name
+            AND f.interviewer = idt.interviewer
+            AND f.interview_round = i.interview_round
+            AND f.job_applicant = i.job_applicant
+            AND f.docstatus != 2
+        WHERE i.status = 'Pending'
+            AND i.docstatus != 2
+            AND IFNULL(idt.interviewer, '') != ''
+            AND f.name IS NULL
+        ORDER BY idt.interviewer, i.scheduled_on, interview
+        """,
+        as_dict=True,
+    )
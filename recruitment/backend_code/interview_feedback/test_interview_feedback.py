@@ -0,0 +1,88 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from recruitment.backend_code.interview_feedback.interview_feedback import (
+    get_feedback_status,
+)
+
+INTERVIEWERS = (
+    "_test_feedback_1@example.com",
+    "_test_feedback_2@example.com",
+    "_test_feedback_3@example.com",
+    "_test_feedback_4@example.com",
+)
+
+
+def insert_without_validation(doc):
+    """Inserts a document and its child rows as-is; the query only reads the tables."""
+    doc = frappe.get_doc(doc)
+    doc.db_insert()
+    for child in doc.get_all_children():
+        child.db_insert()
+    return doc
+
+
+class TestInterviewFeedbackStatus(FrappeTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for interviewer in INTERVIEWERS:
+            if not frappe.db.exists("User", interviewer):
+                frappe.get_doc(
+                    {
+                        "doctype": "User",
+                        "email": interviewer,
+                        "first_name": interviewer.split("@")[0],
+                        "send_welcome_email": 0,
+                    }
+                ).insert(ignore_permissions=True)
+
+        cls.interview = insert_without_validation(
+            {
+                "doctype": "Interview",
+                "name": "_Test Feedback Status Interview",
+                "job_applicant": "_Test Feedback Status Applicant",
+                "interview_round": "Round 1",
+                "status": "Pending",
+                "interview_details": [
+                    {"interviewer": interviewer} for interviewer in INTERVIEWERS
+                ],
+            }
+        ).name
+
+        # Submitted, draft and cancelled feedback, plus feedback for another round
+        for interviewer, docstatus, interview_round in (
+            (INTERVIEWERS[0], 1, "Round 1"),
+            (INTERVIEWERS[1], 0, "Round 1"),
+            (INTERVIEWERS[2], 2, "Round 1"),
+            (INTERVIEWERS[3], 1, "Round 2"),
+        ):
+            insert_without_validation(
+                {
+                    "doctype": "Interview Feedback",
+                    "name": f"_Test Feedback {interviewer}",
+                    "interview": cls.interview,
+                    "interviewer": interviewer,
+                    "job_applicant": "_Test Feedback Status Applicant",
+                    "interview_round": interview_round,
+                    "docstatus": docstatus,
+                }
+            )
+
+    def test_recorded_and_missing_interviewers(self):
+        status = get_feedback_status(self.interview)[self.interview]
+
+        # Submitted and draft feedback are recorded
+        self.assertEqual(status["recorded"], {INTERVIEWERS[0], INTERVIEWERS[1]})
+        # Cancelled feedback and feedback for another round do not count
+        self.assertEqual(status["missing"], {INTERVIEWERS[2], INTERVIEWERS[3]})
+        self.assertEqual(set(status["full_names"]), set(INTERVIEWERS))
+
+    def test_multiple_interviews_in_one_call(self):
+        status = get_feedback_status([self.interview, "_Test Missing Interview"])
+
+        self.assertEqual(len(status[self.interview]["missing"]), 2)
+        self.assertEqual(
+            status["_Test Missing Interview"],
+            {"recorded": set(), "missing": set(), "full_names": {}},
+        )
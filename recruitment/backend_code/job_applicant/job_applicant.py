@@ -8,6 +8,16 @@ from bs4 import BeautifulSoup
 from frappe.utils import now_datetime
 from datetime import timedelta
 from frappe.utils import validate_email_address
+from recruitment.backend_code.dedupe_key.dedupe_key import apply_dedupe_key
+from recruitment.backend_code.outbound_mail.outbound_mail import send_mail
+from recruitment.backend_code.recruiter_metrics.recruiter_metrics import (
+    RECRUITER_METRICS,
+    rebuild_recruiter_metrics,
+)
+from recruitment.backend_code.scheduled_email.scheduled_email import (
+    dispatch_scheduled_emails,
+    get_compiled_email_template,
+)
 
 
 @frappe.whitelist()
@@ -36,51 +46,70 @@ def create_job_offer(source_name, target_doc=None):
     return doc
 
 
+# Email Template sent for each applicant status by send_scheduled_emails
+SCHEDULED_EMAIL_TEMPLATES = {
+    "Shortlisted": "Job Applicant Shortlisted",
+    "Not Shortlisted": "Job Applicant is Rejected",
+}
+SCHEDULED_EMAIL_BATCH_SIZE = 200
+SCHEDULED_EMAIL_MAX_BATCHES = 10
+
+
+def get_pending_scheduled_emails(now, limit, exclude=None):
+    """Pending applicants due for a status mail, with their Job Opening company."""
+    exclude_condition = "AND ja.name NOT IN %(exclude)s" if exclude else ""
+    return frappe.db.sql(
+        f"""
+        SELECT ja.*, jo.company AS job_opening_company
+        FROM `tabJob Applicant` ja
+        LEFT JOIN `tabJob Opening` jo ON jo.name = ja.job_title
+        WHERE ja.custom_email_status = 'Pending'
+        AND ja.custom_email_scheduled_time <= %(now)s
+        AND ja.status IN %(statuses)s
+        {exclude_condition}
+        ORDER BY ja.custom_email_scheduled_time
+        LIMIT %(limit)s
+    """,
+        {
+            "now": now,
+            "statuses": list(SCHEDULED_EMAIL_TEMPLATES),
+            "exclude": exclude,
+            "limit": limit,
+        },
+        as_dict=True,
+    )
+
+
+def send_scheduled_email(job_applicant, cache):
+    """Renders the status mail of one applicant and adds it to the Email Queue."""
+    subject_template, message_template = get_compiled_email_template(
+        SCHEDULED_EMAIL_TEMPLATES[job_applicant.status], cache
+    )
+    context = {
+        "company": job_applicant.job_opening_company,
+        "doc": job_applicant,
+    }
+    frappe.sendmail(
+        recipients=[job_applicant.email_id, job_applicant.owner],
+        subject=subject_template.render(context),
+        message=message_template.render(context),
+        reference_doctype="Job Applicant",
+        reference_name=job_applicant.name,
+    )
+
+
 def send_scheduled_emails():
     """
     Sends pending workflow emails that were scheduled.
     """
     try:
-        now = now_datetime()
-        # Fetch all Job Applicants where email is pending and scheduled time has passed
-        pending_emails = frappe.get_all(
+        return dispatch_scheduled_emails(
             "Job Applicant",
-            filters={
-                "custom_email_status": "Pending",
-                "custom_email_scheduled_time": ["<=", now],
-            },
-            fields=["name", "email_id", "status"],
+            get_pending_scheduled_emails,
+            send_scheduled_email,
+            batch_size=SCHEDULED_EMAIL_BATCH_SIZE,
+            max_batches=SCHEDULED_EMAIL_MAX_BATCHES,
         )
-        for job_applicant in pending_emails:
-            doc = frappe.get_doc("Job Applicant", job_applicant.name)
-            template_name = None
-            # Define the template name based on the action
-            if doc.status == "Shortlisted":
-                template_name = "Job Applicant Shortlisted"
-            elif doc.status == "Not Shortlisted":
-                template_name = "Job Applicant is Rejected"
-            context = {
-                "company": frappe.db.get_value("Job Opening", doc.job_title, "company"),
-                "doc": doc,
-            }
-            if template_name:
-                template_doc = frappe.get_doc("Email Template", template_name)
-            else:
-                continue
-            subject = frappe.render_template(template_doc.subject, context)
-            message = frappe.render_template(template_doc.response, context)
-            frappe.sendmail(
-                recipients=[doc.email_id,doc.owner],
-                subject=subject,
-                message=message,
-                reference_doctype="Job Applicant",
-                reference_name=doc.name,
-                now=True,
-            )
-            # Mark email as sent
-            doc.db_set("custom_email_status", "Sent")
-            doc.save()
-        return f"Processed {len(pending_emails)} pending emails."
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), "Scheduled Email Processing Error")
 
@@ -103,14 +132,14 @@ def send_document_request(applicant, applicant_email, name, hiring_company, posi
         message = frappe.render_template(template_doc.response, context)
        
         
-        frappe.sendmail(
+        send_mail(
+            "Document Request",
             recipients=[applicant_email,frappe.db.get_value("Job Applicant", name, "owner")],
             subject=subject,
             message=message,
             reference_doctype="Job Applicant",
             reference_name=name,
             cc=get_users_with_role("Team Lead - Talent Acquisition"),
-            now=True,
         )
         frappe.db.set_value(
             "Job Applicant", name, "custom_send_document_request_email", 1
@@ -199,7 +228,8 @@ def send_job_description_to_applicant(doc, method=None):
                 <p><strong>{doc.custom_hiring_company} Team</strong></p>
             </body>"""
         # Send the email
-        frappe.sendmail(
+        send_mail(
+            "Job Description",
             cc=get_users_with_role("Team Lead - Talent Acquisition"),
             expose_recipients="header",
             recipients=[doc.email_id,doc.owner],
@@ -207,7 +237,6 @@ def send_job_description_to_applicant(doc, method=None):
             message=message,
             reference_doctype="Job Applicant",
             reference_name=doc.name,
-            now=True,
         )
     except Exception as e:
         # Log the error and show a user-friendly message
@@ -218,19 +247,10 @@ def send_job_description_to_applicant(doc, method=None):
 
 
 def validate_duplicates_for_job_opening(doc, method=None):
+    duplicates = apply_dedupe_key(doc)
     if doc.is_new():
         doc.custom_created_by = frappe.session.user
-        duplicate = frappe.db.exists(
-            "Job Opening",
-            {
-                "designation": doc.designation,
-                "department": doc.department,
-                "name": ("!=", doc.name),
-                "custom_requisition_type": doc.custom_requisition_type,
-                "custom_hiring_company": doc.custom_hiring_company,
-            },
-        )
-        if duplicate:
+        if duplicates["hard"]:
             frappe.throw(
                 _(
                     "A Job Opening for {0} with Hiring Company {1} in Department {2} already exists"
@@ -245,27 +265,16 @@ def validate_duplicates_for_job_opening(doc, method=None):
 
 def validate_duplicates_for_job_applicant(doc, method=None):
     validate_email_address(doc.email_id, throw=True)
-    if doc.is_new():
-            duplicate = frappe.db.exists(
-                "Job Applicant",
-                {
-                    "designation": doc.designation,
-                    "custom_department": doc.custom_department,
-                    "email_id":doc.email_id,
-                    "status":['in',['Draft','Send to Team Leader','Profile Under Review','Shortlisted','R1 Selected','R2 Selected','R3 Selected','Offer Released','Offer Accepted','Joined']],
-                    "custom_hiring_company":doc.custom_hiring_company,
-                    'job_title':doc.job_title
-                },
-            )
-            if duplicate:
-                frappe.throw(
-                    _("A Job Applicant for {0} with Hiring Company {1} in Department {2} already exists").format(
-                        frappe.bold(doc.designation),
-                        frappe.bold(doc.custom_hiring_company),
-                        frappe.bold(doc.custom_department)
-                    ),
-                    title=_("Duplicate Job Applicant"),
-                )
+    duplicates = apply_dedupe_key(doc)
+    if doc.is_new() and duplicates["hard"]:
+        frappe.throw(
+            _("A Job Applicant for {0} with Hiring Company {1} in Department {2} already exists").format(
+                frappe.bold(doc.designation),
+                frappe.bold(doc.custom_hiring_company),
+                frappe.bold(doc.custom_department)
+            ),
+            title=_("Duplicate Job Applicant"),
+        )
     round_status_map = {
         "R1 Selected": ["Round 1"],
         "R1 Rejected": ["Round 1"],
@@ -354,6 +363,56 @@ def validate_duplicates_for_job_applicant(doc, method=None):
             )
 
 
+def get_recruiter_report_data(from_date, to_date):
+    """
+    Returns one row of report counts per Talent Acquisition Executive, summed
+    from the Recruiter Daily Metric rollup for the report days from_date..to_date.
+    """
+    recruiters = get_users_with_role("Talent Acquisition Executive")
+    if not recruiters:
+        return []
+
+    users = {
+        user.name: user
+        for user in frappe.get_all(
+            "User",
+            filters={"name": ["in", recruiters]},
+            fields=["name", "full_name", "email"],
+        )
+    }
+    counts_by_recruiter = {
+        row.pop("recruiter"): row
+        for row in frappe.db.sql(
+            """
+            SELECT recruiter, {metrics}
+            FROM `tabRecruiter Daily Metric`
+            WHERE recruiter IN %(recruiters)s
+            AND metric_date BETWEEN %(from_date)s AND %(to_date)s
+            GROUP BY recruiter
+        """.format(
+                metrics=", ".join(
+                    f"SUM({metric}) AS {metric}" for metric in RECRUITER_METRICS
+                )
+            ),
+            {"recruiters": recruiters, "from_date": from_date, "to_date": to_date},
+            as_dict=True,
+        )
+    }
+
+    report_data = []
+    for recruiter in recruiters:
+        user = users.get(recruiter)
+        if not user:
+            continue
+        counts = counts_by_recruiter.get(recruiter, {})
+        row = {"name": user.full_name, "email": user.email}
+        row.update(
+            {metric: int(counts.get(metric) or 0) for metric in RECRUITER_METRICS}
+        )
+        report_data.append(row)
+    return report_data
+
+
 def send_daily_report():
     # Get the current date and time
     current_datetime = now_datetime()
@@ -369,83 +428,24 @@ def send_daily_report():
     recruitment_manager = get_users_with_role("Manager - Talent Acquisition")
     # Merge both lists and remove duplicates
     recipients = list(set(tl_hr_users + recruitment_manager))
-    recruiters = get_users_with_role("Talent Acquisition Executive")
-    # Initialize the table rows for the email
-    table_rows = ""
-    # Iterate through each recruiter to gather the required data
-    for recruiter in recruiters:
-        recruiter_name = frappe.db.get_value("User", recruiter, "full_name")
-        recruiter_email = frappe.db.get_value("User", recruiter, "email")
-        # Job Applicants Submitted
-        job_applicants_count = len(
-            frappe.db.get_list(
-                "Job Applicant",
-                filters={
-                    "owner": recruiter_email,
-                    "creation": ["between", start_time_str, end_time_str],
-                },
-            )
-        )
-        # Total Interviews Conducted
-        total_interviews_count = frappe.db.sql(
-            """
-            SELECT COUNT(*) 
-            FROM `tabInterview Detail` id
-            JOIN `tabInterview` i ON id.parent = i.name
-            WHERE id.interviewer = %s
-            AND i.creation BETWEEN %s AND %s
-        """,
-            (recruiter_email, start_time_str, end_time_str),
-            as_dict=False,
-        )[0][0]
-        # Final Selections
-        final_selections_count = len(
-            frappe.db.get_list(
-                "Interview",
-                filters={
-                    "owner": recruiter_email,
-                    "interview_round": "Round 2",
-                    "status": "Selected",
-                    "creation": ["between", start_time_str, end_time_str],
-                },
-            )
-        )
-        # Joiners
-        joiners_count = len(
-            frappe.db.get_list(
-                "Job Applicant",
-                filters={
-                    "status": "Joined",
-                    "owner": recruiter_email,
-                    "creation": ["between", start_time_str, end_time_str],
-                },
-            )
-        )
-        # Offers
-        offers_count = len(
-            frappe.db.get_list(
-                "Job Offer",
-                filters={
-                    "owner": recruiter_email,
-                    "workflow_state": "Approved",
-                    "creation": ["between", start_time_str, end_time_str],
-                },
-            )
-        )
-        # Format each recruiter's data into a table row
-        table_row = f"""
+    # Recount today's rollup so updates made through db_set are included
+    report_date = end_time_str.date()
+    rebuild_recruiter_metrics(report_date, report_date)
+    # Format each recruiter's data into a table row
+    table_rows = "".join(
+        f"""
         <tr>
-            <td style="text-align:center;">{recruiter_name}</td>
-            <td style="text-align:center;">{recruiter_email}</td>
-            <td style="text-align:center;">{job_applicants_count}</td>
-            <td style="text-align:center;">{total_interviews_count}</td>
-            <td style="text-align:center;">{final_selections_count}</td>
-            <td style="text-align:center;">{joiners_count}</td>
-            <td style="text-align:center;">{offers_count}</td>
+            <td style="text-align:center;">{data["name"]}</td>
+            <td style="text-align:center;">{data["email"]}</td>
+            <td style="text-align:center;">{data["job_applicants_count"]}</td>
+            <td style="text-align:center;">{data["total_interviews_count"]}</td>
+            <td style="text-align:center;">{data["final_selections_count"]}</td>
+            <td style="text-align:center;">{data["joiners_count"]}</td>
+            <td style="text-align:center;">{data["offers_count"]}</td>
         </tr>
         """
-        # Append the row to the table
-        table_rows += table_row
+        for data in get_recruiter_report_data(report_date, report_date)
+    )
     # HTML content for the email
     email_html = f"""
     <p>Dear Team Leads and Recruitment Head,</p>
@@ -470,11 +470,11 @@ def send_daily_report():
     <p>The Recruitment Team</p>
     """
     # Send the email
-    frappe.sendmail(
+    send_mail(
+        "Daily Recruitment Report",
         recipients=recipients,
         subject=f"Daily Recruitment Report - {end_time_str.strftime('%Y-%m-%d')}",
         message=email_html,
-        now=True,
     )
 
 
@@ -505,130 +505,13 @@ def send_monthly_report():
     recruitment_manager = get_users_with_role("Manager - Talent Acquisition")
     # Merge both lists and remove duplicates
     recipients = list(set(tl_hr_users + recruitment_manager))
-    recruiters = get_users_with_role("Talent Acquisition Executive")
-    # Initialize recruiter performance list
-    recruiter_data = []
-    # Iterate through each recruiter to gather performance data
-    for recruiter in recruiters:
-        recruiter_name = frappe.db.get_value("User", recruiter, "full_name")
-        recruiter_email = frappe.db.get_value("User", recruiter, "email")
-        # Job Applicants Submitted
-        job_applicants_count = len(
-            frappe.db.get_list(
-                "Job Applicant",
-                filters={
-                    "owner": recruiter_email,
-                    "creation": ["between", start_time_str, end_time_str],
-                },
-            )
-        )
-        # Status breakdown
-        profile_under_review = len(
-            frappe.db.get_list(
-                "Job Applicant",
-                filters={
-                    "owner": recruiter_email,
-                    "status": "Profile Under Review",
-                    "creation": ["between", start_time_str, end_time_str],
-                },
-            )
-        )
-        candidate_backed_out = len(
-            frappe.db.get_list(
-                "Job Applicant",
-                filters={
-                    "owner": recruiter_email,
-                    "status": "Candidate Backed Out",
-                    "creation": ["between", start_time_str, end_time_str],
-                },
-            )
-        )
-        offer_declined = len(
-            frappe.db.get_list(
-                "Job Applicant",
-                filters={
-                    "owner": recruiter_email,
-                    "status": "Offer Declined",
-                    "creation": ["between", start_time_str, end_time_str],
-                },
-            )
-        )
-        shortlisted = len(
-            frappe.db.get_list(
-                "Job Applicant",
-                filters={
-                    "owner": recruiter_email,
-                    "status": "Shortlisted",
-                    "creation": ["between", start_time_str, end_time_str],
-                },
-            )
-        )
+    recruiter_data = get_recruiter_report_data(start_time.date(), end_time.date())
+    for data in recruiter_data:
         # Calculate Shortlisting Ratio
-        shortlisting_ratio = (
-            (shortlisted / job_applicants_count * 100) if job_applicants_count else 0
-        )
-        # Total Interviews Conducted
-        total_interviews_count = frappe.db.sql(
-            """
-            SELECT COUNT(*) 
-            FROM `tabInterview Detail` id
-            JOIN `tabInterview` i ON id.parent = i.name
-            WHERE id.interviewer = %s
-            AND i.creation BETWEEN %s AND %s
-        """,
-            (recruiter_email, start_time_str, end_time_str),
-            as_dict=False,
-        )[0][0]
-        # Final Selections
-        final_selections_count = len(
-            frappe.db.get_list(
-                "Interview",
-                filters={
-                    "owner": recruiter_email,
-                    "interview_round": "Round 2",
-                    "status": "Selected",
-                    "creation": ["between", start_time_str, end_time_str],
-                },
-            )
-        )
-        # Joiners
-        joiners_count = len(
-            frappe.db.get_list(
-                "Job Applicant",
-                filters={
-                    "status": "Joined",
-                    "owner": recruiter_email,
-                    "creation": ["between", start_time_str, end_time_str],
-                },
-            )
-        )
-        # Offers
-        offers_count = len(
-            frappe.db.get_list(
-                "Job Offer",
-                filters={
-                    "owner": recruiter_email,
-                    "workflow_state": "Approved",
-                    "creation": ["between", start_time_str, end_time_str],
-                },
-            )
-        )
-        # Store data for sorting
-        recruiter_data.append(
-            {
-                "name": recruiter_name,
-                "email": recruiter_email,
-                "job_applicants_count": job_applicants_count,
-                "total_interviews_count": total_interviews_count,
-                "shortlisted": shortlisted,
-                "shortlisting_ratio": shortlisting_ratio,
-                "profile_under_review": profile_under_review,
-                "final_selections_count": final_selections_count,
-                "joiners_count": joiners_count,
-                "offers_count": offers_count,
-                "candidate_backed_out": candidate_backed_out,
-                "offer_declined": offer_declined,
-            }
+        data["shortlisting_ratio"] = (
+            (data["shortlisted"] / data["job_applicants_count"] * 100)
+            if data["job_applicants_count"]
+            else 0
         )
     # Sort recruiters based on the ranking criteria (ascending order)
     recruiter_data.sort(
@@ -687,9 +570,9 @@ def send_monthly_report():
     <p>The Recruitment Team</p>
     """
     # Send the email
-    frappe.sendmail(
+    send_mail(
+        "Monthly Recruitment Report",
         recipients=recipients,
         subject=f"Monthly Recruitment Report - {current_datetime.strftime('%B %Y')}",
         message=email_html,
-        now=True,
     )
@@ -1,69 +1,38 @@
 import frappe
+import hashlib
+import math
 import os
 from frappe.utils import flt
 import frappe.utils
-from frappe.utils.pdf import get_pdf
 from frappe import _
-import base64
 from frappe.utils.user import get_users_with_role
-from hrms.payroll.doctype.salary_slip.salary_slip import _safe_eval
 from frappe.utils import now_datetime, flt
 from dateutil.relativedelta import relativedelta
 from decimal import Decimal, ROUND_HALF_UP
 from frappe.utils.user import get_users_with_role
 from mantra_dev.backend_code.globle import create_notification_log
-
-
-def _safe_eval(expression, context):
-    try:
-        return eval(expression, {"__builtins__": {}}, context)
-    except Exception as e:
-        frappe.log_error(
-            f"Error in formula evaluation: {expression} - {str(e)}",
-            "Salary Structure Evaluation",
-        )
-        return 0
-
-
-def evaluate_formula_split(formula, context):
-    """
-    Evaluate a formula by splitting it into smaller chunks.
-    """
-    try:
-        formula_chunks = formula.split("AND")  # Example: Split by logical AND
-        result = sum(_safe_eval(chunk.strip(), context) for chunk in formula_chunks)
-        return result
-    except Exception as e:
-        frappe.log_error(
-            f"Error evaluating formula: {formula} - {str(e)}",
-            "Salary Structure Evaluation",
-        )
-        return 0
-
-
-def fetch_component_formula(abbr):
-    """Fetch the formula for a given salary component abbreviation from the database."""
-    formula = frappe.db.get_value(
-        "Salary Component", {"salary_component_abbr": abbr}, "formula"
-    )
-    if formula:
-        return formula  # Return formula if found
-    return frappe.db.get_value(
-        "Salary Component", {"salary_component_abbr": abbr}, "amount"
-    )  # Otherwise, return amount
-
-
-def extract_variables(formula):
-    """Extracts variables from a formula string."""
-    return [
-        var.strip()
-        for var in formula.replace("(", " ")
-        .replace(")", " ")
-        .replace("+", " ")
-        .replace("-", " ")
-        .split()
-        if var.strip()
-    ]
+from recruitment.backend_code.company_assets.company_assets import (
+    COMPANY_ASSET_KEYS,
+    get_company_image,
+)
+from recruitment.backend_code.dedupe_key.dedupe_key import refresh_dedupe_key
+from recruitment.backend_code.outbound_mail.outbound_mail import send_mail
+from recruitment.backend_code.pdf_render.pdf_render import (
+    enqueue_pdf_render,
+    render_pdf,
+)
+from recruitment.backend_code.template_registry.template_registry import render_template
+from recruitment.backend_code.recruiter_metrics.recruiter_metrics import (
+    refresh_document_metrics,
+)
+from recruitment.backend_code.scheduled_email.scheduled_email import (
+    dispatch_scheduled_emails,
+    get_compiled_email_template,
+)
+from recruitment.backend_code.salary_structure.salary_structure import (
+    get_compiled_salary_structure,
+    get_formula_version,
+)
 
 
 def calculate_salary_components(
@@ -87,155 +56,9 @@ def calculate_salary_components(
         "custom_stateprovince_for_pt": custom_stateprovince_for_pt,
     }
 
-    # First, store all direct amounts and formulas in context
-    pending_formulas = {}
-    for component in salary_structure.get("earnings", []) + salary_structure.get(
-        "deductions", []
-    ):
-        abbr, amount = component.get("abbr"), component.get("amount")
-        formula = component.get("formula") or fetch_component_formula(
-            abbr
-        )  # Fetch formula from Salary Component if not provided
-        if abbr:
-            if formula:
-                pending_formulas[abbr] = formula  # Store formula for later evaluation
-            elif amount is not None:
-                context[
-                    abbr
-                ] = amount  # Store base value in context if no formula exists
-
-    def evaluate_with_dependencies(abbr, salary_structure, context, is_deduction=False):
-        """Recursively evaluates formula components that have dependencies."""
-        if abbr in context:
-            return context[abbr]
-
-        # Check if the component exists in the earnings table (if not a deduction)
-        component = (
-            next(
-                (
-                    c
-                    for c in salary_structure.get("earnings", [])
-                    if c.get("abbr") == abbr
-                ),
-                None,
-            )
-            if not is_deduction
-            else next(
-                (
-                    c
-                    for c in salary_structure.get("deductions", [])
-                    if c.get("abbr") == abbr
-                ),
-                None,
-            )
-        )
-
-        formula = None
-        if component:
-            formula = component.get("formula") or fetch_component_formula(abbr)
-        else:
-            formula = fetch_component_formula(
-                abbr
-            )  # Fetch even if not in earnings/deductions
-
-        if isinstance(formula, (int, float)):
-            context[abbr] = formula
-            return formula
-
-        if isinstance(formula, str) and formula.strip():
-            dependencies = extract_variables(formula)
-            temp_context = context.copy()  # Temporary context for calculation
-            for var in dependencies:
-                if var not in context:
-                    if not is_deduction:  # Only treat as 0 in calculations for earnings
-                        temp_context[var] = (
-                            evaluate_with_dependencies(var, salary_structure, context)
-                            if var
-                            in [
-                                c.get("abbr")
-                                for c in salary_structure.get("earnings", [])
-                            ]
-                            else 0
-                        )
-                    else:
-                        temp_context[var] = evaluate_with_dependencies(
-                            var, salary_structure, context, is_deduction=True
-                        )
-
-            context[abbr] = evaluate_formula_split(formula, temp_context)
-            return context[abbr]
-
-        context[abbr] = 0 if not is_deduction else context.get(abbr, 0)
-        return context[abbr]
-
-    import math
-
-    def process_components(components, salary_structure, context, is_deduction=False):
-        total = 0
-        result = []
-
-        # Define components to exclude from deductions
-        excluded_deductions = {
-            "Income Tax",
-            "Income Tax - 194C",
-            "Income Tax - 194J",
-            "Loan Repayment",
-            "Other Deduction",
-        }
-        excluded_earnings = {"Gratuity"}
-
-        for component in components:
-            abbr = component.get("abbr")
-            is_statical = component.get("statistical_component", 0)
-            salary_component_name = component.get("salary_component")
-
-            # Skip excluded deductions
-            if is_deduction and salary_component_name in excluded_deductions:
-                continue
-
-            if not is_deduction and salary_component_name in excluded_earnings:
-                continue
-
-            if abbr:
-                value = evaluate_with_dependencies(
-                    abbr, salary_structure, context, is_deduction
-                )
-            else:
-                value = 0
-
-            # Apply ceil and keep 2 decimal places
-            value = math.ceil(value * 100) / 100
-
-            if not is_statical:
-                total += value  # Accumulate values
-
-                result.append(
-                    {
-                        "salary_component": salary_component_name,
-                        "amount": value,  # Store ceiled value
-                    }
-                )
-
-        return result, total
-
-    earnings, total_earnings = process_components(
-        salary_structure.get("earnings", []),
-        salary_structure,
-        context,
-        is_deduction=False,
-    )
-    deductions, total_deductions = process_components(
-        salary_structure.get("deductions", []),
-        salary_structure,
-        context,
-        is_deduction=True,
-    )
-    return {
-        "earnings": earnings,
-        "deductions": deductions,
-        "total_earnings": round(total_earnings, 0),
-        "total_deductions": round(total_deductions, 0),
-    }
+    # Formulas are compiled once per Salary Structure revision and reused
+    compiled_structure = get_compiled_salary_structure(salary_structure)
+    return compiled_structure.calculate(context)
 
 
 @frappe.whitelist()
@@ -263,6 +86,11 @@ def get_gratuity_value(docname):
         custom_stateprovince_for_pt=job_offer_doc.custom_stateprovince_for_pt,
     )
 
+    return calculate_gratuity_and_nps(calculated_data)
+
+
+def calculate_gratuity_and_nps(calculated_data):
+    """Gratuity and NPS amounts derived from the Basic component of a breakdown."""
     # Fetch Basic Salary from earnings
     basic_salary = next(
         (
@@ -280,6 +108,186 @@ def get_gratuity_value(docname):
     return {"gratuity": gratuity, "nps": nps}
 
 
+def prepare_offer_salary_data(calculated_data, gratuity_amount=None, nps_amount=None):
+    """
+    Adjusts a salary breakdown the way it is printed on the offer letter: employer
+    PF/ESIC contributions are shown separately, gratuity is carved out of Special
+    Allowance and NPS is added to deductions.
+    """
+    employer_pf_contribution = sum(
+        d["amount"]
+        for d in calculated_data["deductions"]
+        if d["salary_component"] == "Employer's Contribution to PF"
+    )
+    employer_esic_contribution = sum(
+        e["amount"]
+        for e in calculated_data["earnings"]
+        if e["salary_component"] == "Employer's Contribution to ESIC"
+    )
+
+    calculated_data.update(
+        {
+            "earnings": [
+                e
+                for e in calculated_data["earnings"]
+                if e["salary_component"] != "Employer's Contribution to ESIC"
+            ],
+            "deductions": [
+                d
+                for d in calculated_data["deductions"]
+                if d["salary_component"] != "Employer's Contribution to PF"
+            ],
+            "total_earnings": round(calculated_data["total_earnings"], 0)
+            - employer_esic_contribution,
+            "total_deductions": round(calculated_data["total_deductions"], 0)
+            - employer_pf_contribution,
+            "employer_pf_contribution": employer_pf_contribution,
+            "employer_esic_contribution": employer_esic_contribution,
+        }
+    )
+
+    if gratuity_amount:
+        calculated_data["total_earnings"] -= gratuity_amount
+        for earning in calculated_data["earnings"]:
+            if earning.get("salary_component") == "Special Allowance":
+                earning["amount"] -= gratuity_amount
+                break
+
+    if nps_amount:
+        calculated_data["total_deductions"] += nps_amount
+
+    return calculated_data
+
+
+# Upper bound on CTC x PF type x PT state combinations in one simulation
+MAX_CTC_SIMULATIONS = 500
+
+
+@frappe.whitelist()
+def simulate_ctc_band(
+    salary_structure,
+    ctc_values,
+    pf_types=None,
+    pt_states=None,
+    custom_additional_pf=None,
+):
+    """
+    Returns the earnings/deductions breakdown of a Salary Structure for every
+    combination of CTC, PF type and PT state in a single call.
+    """
+    frappe.has_permission("Job Offer", "read", throw=True)
+
+    ctc_values = [flt(ctc) for ctc in frappe.parse_json(ctc_values) or []]
+    pf_types = frappe.parse_json(pf_types) or [None]
+    pt_states = frappe.parse_json(pt_states) or [None]
+
+    if len(ctc_values) * len(pf_types) * len(pt_states) > MAX_CTC_SIMULATIONS:
+        frappe.throw(
+            _("Cannot simulate more than {0} CTC combinations at once").format(
+                MAX_CTC_SIMULATIONS
+            )
+        )
+
+    # The structure is compiled on the first evaluation and reused for the band
+    salary_structure_doc = frappe.get_doc("Salary Structure", salary_structure)
+    results = []
+    for pf_type in pf_types:
+        for pt_state in pt_states:
+            for ctc in ctc_values:
+                calculated_data = calculate_salary_components(
+                    job_offer_doc=None,
+                    salary_structure=salary_structure_doc,
+                    ctc=ctc,
+                    payment_days=31,
+                    total_working_days=31,
+                    custom_pf_type=pf_type,
+                    custom_additional_pf=custom_additional_pf or 0,
+                    custom_stateprovince_for_pt=pt_state,
+                )
+                calculated_data.update(
+                    {
+                        "ctc": ctc,
+                        "custom_pf_type": pf_type,
+                        "custom_stateprovince_for_pt": pt_state,
+                    }
+                )
+                results.append(calculated_data)
+    return results
+
+
+# Precision, in rupees of yearly CTC, at which the take-home solver stops
+CTC_SOLVER_TOLERANCE = 1
+CTC_SOLVER_MAX_ITERATIONS = 64
+
+
+@frappe.whitelist()
+def solve_ctc_for_take_home(
+    salary_structure,
+    target_take_home,
+    custom_pf_type=None,
+    custom_additional_pf=None,
+    custom_stateprovince_for_pt=None,
+    gratuity=0,
+    nps=0,
+):
+    """
+    Returns the minimal yearly CTC whose monthly take-home, as printed on the
+    offer letter, reaches `target_take_home`.
+    """
+    frappe.has_permission("Job Offer", "read", throw=True)
+
+    target_take_home = flt(target_take_home)
+    if target_take_home <= 0:
+        frappe.throw(_("Target take-home must be greater than zero"))
+
+    salary_structure_doc = frappe.get_doc("Salary Structure", salary_structure)
+
+    def get_take_home(ctc):
+        calculated_data = calculate_salary_components(
+            job_offer_doc=None,
+            salary_structure=salary_structure_doc,
+            ctc=ctc,
+            payment_days=31,
+            total_working_days=31,
+            custom_pf_type=custom_pf_type,
+            custom_additional_pf=custom_additional_pf or 0,
+            custom_stateprovince_for_pt=custom_stateprovince_for_pt,
+        )
+        # Gratuity and NPS follow Basic, so they move with every CTC tried
+        amounts = calculate_gratuity_and_nps(calculated_data)
+        calculated_data = prepare_offer_salary_data(
+            calculated_data,
+            gratuity_amount=amounts["gratuity"] if frappe.utils.cint(gratuity) else None,
+            nps_amount=amounts["nps"] if frappe.utils.cint(nps) else None,
+        )
+        return calculated_data["total_earnings"] - calculated_data["total_deductions"]
+
+    # Take-home is a step function of CTC because of the ceil/round steps, so
+    # bracket the target and bisect on "reaches target" instead of root finding
+    low, high = 0, target_take_home * 12
+    iterations = 0
+    while get_take_home(high) < target_take_home:
+        low, high = high, high * 2
+        iterations += 1
+        if iterations >= CTC_SOLVER_MAX_ITERATIONS:
+            frappe.throw(
+                _("Salary Structure {0} cannot reach a take-home of {1}").format(
+                    frappe.bold(salary_structure), frappe.bold(target_take_home)
+                )
+            )
+
+    while high - low > CTC_SOLVER_TOLERANCE and iterations < CTC_SOLVER_MAX_ITERATIONS:
+        middle = (low + high) / 2
+        if get_take_home(middle) >= target_take_home:
+            high = middle
+        else:
+            low = middle
+        iterations += 1
+
+    ctc = math.ceil(high)
+    return {"ctc": ctc, "take_home": get_take_home(ctc), "iterations": iterations}
+
+
 def get_day_with_suffix(day):
     if 10 <= day <= 20:  # Special case for 11th, 12th, 13th, etc.
         suffix = "th"
@@ -288,26 +296,179 @@ def get_day_with_suffix(day):
     return f"{day}<sup> {suffix}</sup>"
 
 
-@frappe.whitelist()
-def download_job_offer_pdf(docname, action=None):
-    job_offer_doc = frappe.get_doc("Job Offer", docname)
-    html_template = ""
+JOB_OFFER_RENDER_PREFIX = "job-offer-render"
+JOB_OFFER_PDF_OPTIONS = {"page-size": "A4", "margin-top": "0mm", "margin-bottom": "0mm"}
+
+
+def get_job_offer_template(job_offer_doc):
+    """Jinja template used to render the offer letter or consultant agreement."""
+    if job_offer_doc.custom_employment_type == "Consultant":
+        if job_offer_doc.custom_standard_sales_format:
+            return "recruitment/public/js/templates/consultant_agreement1.html"
+        return "recruitment/public/js/templates/consultant_agreement.html"
+    if job_offer_doc.custom_employment_type == "Intern":
+        return "recruitment/public/js/templates/trainee_offer_format.html"
+    if job_offer_doc.custom_employment_type == "Full-Time":
+        html_file_mapping = {
+            (False, False): "with_salary_format.html",
+            (True, False): "without_department_format.html",
+            (False, True): "without_salary_format.html",
+        }
+        return f"recruitment/public/js/templates/{html_file_mapping.get((job_offer_doc.custom_without_department, job_offer_doc.custom_with_annexure))}"
+    return ""
+
+
+def get_job_offer_render_key(job_offer_doc, html_template, action):
+    """
+    Hash of everything a rendered offer depends on: the Job Offer content, the
+    template file, and for approved offers the salary structure and formulas.
+    """
+    parts = [
+        job_offer_doc.name,
+        get_job_offer_content_hash(job_offer_doc),
+        html_template,
+        action,
+    ]
+    template_path = frappe.get_app_path("recruitment", *html_template.split("/")[1:])
+    if html_template and os.path.exists(template_path):
+        parts.append(str(os.path.getmtime(template_path)))
+    if (
+        job_offer_doc.custom_employment_type != "Consultant"
+        and job_offer_doc.workflow_state == "Approved"
+        and job_offer_doc.custom_salary_structure
+    ):
+        parts.append(
+            str(
+                frappe.db.get_value(
+                    "Salary Structure", job_offer_doc.custom_salary_structure, "modified"
+                )
+            )
+        )
+        parts.append(str(get_formula_version()))
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+def get_job_offer_content_hash(job_offer_doc):
+    """Hash of the field values of a Job Offer, ignoring modified and other system fields."""
+    content = job_offer_doc.as_dict(no_default_fields=True, no_child_table_fields=True)
+    return hashlib.sha1(frappe.as_json(content).encode()).hexdigest()
+
+
+def get_job_offer_render_file_name(docname, render_key, extension):
+    return f"{JOB_OFFER_RENDER_PREFIX}-{docname}-{render_key}.{extension}"
+
+
+def get_cached_job_offer_render(docname, render_key, extension):
+    """Rendered HTML or PDF stored for this revision, or None."""
+    file_name = frappe.db.get_value(
+        "File",
+        {
+            "file_name": get_job_offer_render_file_name(docname, render_key, extension),
+            "is_private": 1,
+        },
+    )
+    if not file_name:
+        return None
+    file_path = frappe.get_doc("File", file_name).get_full_path()
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, "rb") as f:
+        content = f.read()
+    return frappe.safe_decode(content) if extension == "html" else content
+
+
+def cache_job_offer_render(docname, render_key, extension, content):
+    """
+    Stores a rendered offer as a private File. It is not attached to the Job
+    Offer, so it stays out of the sidebar and timeline; its file name finds it.
+    """
+    frappe.get_doc(
+        {
+            "doctype": "File",
+            "file_name": get_job_offer_render_file_name(docname, render_key, extension),
+            "is_private": 1,
+            "content": content,
+        }
+    ).insert(ignore_permissions=True)
+
+
+def clear_job_offer_render_cache(doc, method=None):
+    """
+    Deletes the rendered offers of a Job Offer when a change can affect them.
+    Saves that leave every field value as it was keep the cache.
+    """
+    if method != "on_trash":
+        previous = doc.get_doc_before_save()
+        if previous and get_job_offer_content_hash(previous) == get_job_offer_content_hash(
+            doc
+        ):
+            return
+
+    # Prefix match on the file name index (db_indexes), with LIKE wildcards escaped
+    prefix = f"{JOB_OFFER_RENDER_PREFIX}-{doc.name}-"
+    for char in ("\\", "%", "_"):
+        prefix = prefix.replace(char, "\\" + char)
+    for file_name in frappe.db.sql_list(
+        "SELECT name FROM `tabFile` WHERE file_name LIKE %s AND is_private = 1",
+        prefix + "%",
+    ):
+        frappe.delete_doc("File", file_name, ignore_permissions=True, force=True)
+
+
+def get_offer_salary_data(job_offer_doc, salary_cache=None):
+    """
+    Salary breakdown shown in the offer letter. `salary_cache` lets bulk runs load
+    each Salary Structure once and reuse breakdowns of offers with the same terms.
+    """
+    if salary_cache is None:
+        salary_cache = {}
+    gratuity_amount = (
+        job_offer_doc.custom_gratuity_amount if job_offer_doc.custom_gratuity else None
+    )
+    nps_amount = job_offer_doc.custom_nps_amount if job_offer_doc.custom_nps else None
+    key = (
+        job_offer_doc.custom_salary_structure,
+        flt(job_offer_doc.custom_fixed_ctc),
+        job_offer_doc.custom_pf_type,
+        job_offer_doc.custom_addtional_pf or 0,
+        job_offer_doc.custom_stateprovince_for_pt,
+        gratuity_amount,
+        nps_amount,
+    )
+    if key not in salary_cache:
+        structure_key = ("Salary Structure", job_offer_doc.custom_salary_structure)
+        if structure_key not in salary_cache:
+            salary_cache[structure_key] = frappe.get_doc(*structure_key)
+
+        calculated_data = calculate_salary_components(
+            job_offer_doc=job_offer_doc,
+            salary_structure=salary_cache[structure_key],
+            ctc=job_offer_doc.custom_fixed_ctc,
+            payment_days=31,
+            total_working_days=31,
+            custom_pf_type=job_offer_doc.custom_pf_type,
+            custom_additional_pf=job_offer_doc.custom_addtional_pf or 0,
+            custom_stateprovince_for_pt=job_offer_doc.custom_stateprovince_for_pt,
+        )
+        salary_cache[key] = prepare_offer_salary_data(
+            calculated_data, gratuity_amount=gratuity_amount, nps_amount=nps_amount
+        )
+    return salary_cache[key]
+
+
+def render_job_offer_html(job_offer_doc, html_template, action, salary_cache=None):
+    """Renders the offer letter or consultant agreement HTML of a Job Offer."""
     body_width = (
         'style="width:50%;"' if action == "Preview Job Offer" else 'style="width:auto;"'
     )
-    company_assets = {
-        "Mefron Technologies (India) Private Limited": "mefron",
-        "Mantra Softech (India) Private Limited": "mantra",
-        "Mitras Global Private Limited": "mitras",
-        "Mocula Optics Technologies Private Limited": "mocula",
-        "Mantra Smart Identity Private Limited": "mantra_identity",
-        "Mivanta India Private Limited": "mivanta",
-    }
-    company_key = company_assets.get(job_offer_doc.custom_hiring_company)
-    header = footer = ""
-    if company_key:
-        header = f'<img src="/assets/recruitment/images/{company_key}_header.png" width="100%" alt="{job_offer_doc.custom_hiring_company} Header"/>'
-        footer = f'<img src="/assets/recruitment/images/{company_key}_footer.png" width="100%" alt="{job_offer_doc.custom_hiring_company} Footer"/>'
+    # Header and footer images are inlined so wkhtmltopdf does not fetch them
+    company_key = COMPANY_ASSET_KEYS.get(job_offer_doc.custom_hiring_company)
+    header = get_company_image(
+        company_key, "header", f"{job_offer_doc.custom_hiring_company} Header"
+    )
+    footer = get_company_image(
+        company_key, "footer", f"{job_offer_doc.custom_hiring_company} Footer"
+    )
     template_data = {}
 
     if job_offer_doc.custom_employment_type == "Consultant":
@@ -340,77 +501,12 @@ def download_job_offer_pdf(docname, action=None):
             "month_difference"
         ] = f"{frappe.utils.money_in_words(month_difference, main_currency='').split(' ')[1]} ({month_difference}) {'month' if month_difference == 1 else 'months'}"
 
-        template_data["doc"] = job_offer_doc
-        company_name = job_offer_doc.custom_hiring_company
-        template_data["company"] = company_name
-
-        if job_offer_doc.custom_standard_sales_format:
-            html_template = "recruitment/public/js/templates/consultant_agreement1.html"
-        else:
-            html_template = "recruitment/public/js/templates/consultant_agreement.html"
-
     else:
         calculated_data = None
         if job_offer_doc.workflow_state == "Approved":
             if not job_offer_doc.custom_salary_structure:
                 frappe.throw("Salary Structure is not Selected")
-            salary_structure_doc = frappe.get_doc(
-                "Salary Structure", job_offer_doc.custom_salary_structure
-            )
-
-            calculated_data = calculate_salary_components(
-                job_offer_doc=job_offer_doc,
-                salary_structure=salary_structure_doc,
-                ctc=job_offer_doc.custom_fixed_ctc,
-                payment_days=31,
-                total_working_days=31,
-                custom_pf_type=job_offer_doc.custom_pf_type,
-                custom_additional_pf=job_offer_doc.custom_addtional_pf or 0,
-                custom_stateprovince_for_pt=job_offer_doc.custom_stateprovince_for_pt,
-            )
-
-            employer_pf_contribution = sum(
-                d["amount"]
-                for d in calculated_data["deductions"]
-                if d["salary_component"] == "Employer's Contribution to PF"
-            )
-            employer_esic_contribution = sum(
-                e["amount"]
-                for e in calculated_data["earnings"]
-                if e["salary_component"] == "Employer's Contribution to ESIC"
-            )
-
-            calculated_data.update(
-                {
-                    "earnings": [
-                        e
-                        for e in calculated_data["earnings"]
-                        if e["salary_component"] != "Employer's Contribution to ESIC"
-                    ],
-                    "deductions": [
-                        d
-                        for d in calculated_data["deductions"]
-                        if d["salary_component"] != "Employer's Contribution to PF"
-                    ],
-                    "total_earnings": round(calculated_data["total_earnings"], 0)
-                    - employer_esic_contribution,
-                    "total_deductions": round(calculated_data["total_deductions"], 0)
-                    - employer_pf_contribution,
-                    "employer_pf_contribution": employer_pf_contribution,
-                    "employer_esic_contribution": employer_esic_contribution,
-                }
-            )
-
-            if job_offer_doc.custom_gratuity:
-                gratuity_amount = job_offer_doc.custom_gratuity_amount
-                calculated_data["total_earnings"] -= gratuity_amount
-                for earning in calculated_data["earnings"]:
-                    if earning.get("salary_component") == "Special Allowance":
-                        earning["amount"] -= gratuity_amount
-                        break
-
-            if job_offer_doc.custom_nps:
-                calculated_data["total_deductions"] += job_offer_doc.custom_nps_amount
+            calculated_data = get_offer_salary_data(job_offer_doc, salary_cache)
 
         offer_date = job_offer_doc.offer_date.strftime(
             f"{get_day_with_suffix(job_offer_doc.offer_date.day)} %B %Y"
@@ -437,59 +533,135 @@ def download_job_offer_pdf(docname, action=None):
         }
 
         if job_offer_doc.custom_employment_type == "Intern":
-            pdf_content = get_pdf(
-                frappe.get_print(
-                    job_offer_doc.doctype, docname, "Trainee Job Offer Format"
-                )
-            )
-            template_data["annxture"] = pdf_content
             template_data["traning_month"] = frappe.utils.money_in_words(
                 job_offer_doc.custom_training_period_in_months, main_currency=""
             ).split(" ")[1]
-            html_template = "recruitment/public/js/templates/trainee_offer_format.html"
 
-        elif job_offer_doc.custom_employment_type == "Full-Time":
-            html_file_mapping = {
-                (False, False): "with_salary_format.html",
-                (True, False): "without_department_format.html",
-                (False, True): "without_salary_format.html",
-            }
-            html_template = f"recruitment/public/js/templates/{html_file_mapping.get((job_offer_doc.custom_without_department, job_offer_doc.custom_with_annexure))}"
+    template_data["is_extra_space"] = 0 if action == "Preview Job Offer" else 1
+    return render_template(html_template, template_data)
 
-    if action == "Preview Job Offer":
 
-        template_data["is_extra_space"] = 0
-        html = frappe.render_template(html_template, template_data)
-        return html
-    elif action == "Download Job Offer":
-        template_data["is_extra_space"] = 1
-        html = frappe.render_template(html_template, template_data)
-        pdf_content = get_pdf(
-            html,
-            options={"page-size": "A4", "margin-top": "0mm", "margin-bottom": "0mm"},
-        )
-        if job_offer_doc.custom_employment_type in ["Full-Time", "Intern"]:
-            return {
-                "pdf_base64": base64.b64encode(pdf_content).decode("utf-8"),
-                "filename": f"{job_offer_doc.applicant_name}_job_offer_{job_offer_doc.name}.pdf",
-            }
-        else:
-            return {
-                "pdf_base64": base64.b64encode(pdf_content).decode("utf-8"),
-                "filename": f"{job_offer_doc.applicant_name}_consultant_agreement.pdf",
-            }
-    elif action == "Send Job Offer":
-        pdf = get_pdf(
-            html,
-            options={"page-size": "A4", "margin-top": "0mm", "margin-bottom": "0mm"},
+def get_job_offer_render_action(action):
+    # Send Job Offer mails the same PDF that Download Job Offer returns
+    return "Preview Job Offer" if action == "Preview Job Offer" else "Download Job Offer"
+
+
+def get_job_offer_render(
+    job_offer_doc, action, cached_only=False, salary_cache=None, write_cache=True
+):
+    """
+    Rendered HTML (Preview) or PDF (Download/Send) of a Job Offer, from the
+    revision cache when possible. With `cached_only`, returns None on a miss;
+    without `write_cache`, a miss is rendered but not stored.
+    """
+    render_action = get_job_offer_render_action(action)
+    html_template = get_job_offer_template(job_offer_doc)
+    extension = "html" if render_action == "Preview Job Offer" else "pdf"
+    render_key = get_job_offer_render_key(job_offer_doc, html_template, render_action)
+
+    content = get_cached_job_offer_render(job_offer_doc.name, render_key, extension)
+    if content is None and not cached_only:
+        content = render_job_offer_html(
+            job_offer_doc, html_template, render_action, salary_cache
         )
-        frappe.msgprint(_("The job offer PDF has been sent to the applicant's email."))
+        if extension == "pdf":
+            content = render_pdf(content, options=JOB_OFFER_PDF_OPTIONS)
+        if write_cache:
+            cache_job_offer_render(job_offer_doc.name, render_key, extension, content)
+    return content
+
+
+@frappe.whitelist()
+def enqueue_job_offer_pdf(docname, action="Download Job Offer"):
+    """
+    Renders the Job Offer PDF on the PDF queue unless this revision is already
+    cached. Returns {"status": "Ready"} or {"status": "Queued", "job_id": ...};
+    the form is notified over realtime when a queued render completes.
+    """
+    job_offer_doc = frappe.get_doc("Job Offer", docname)
+    job_offer_doc.check_permission("read")
+    if get_job_offer_render(job_offer_doc, action, cached_only=True) is not None:
+        return {"status": "Ready"}
+
+    render_action = get_job_offer_render_action(action)
+    render_key = get_job_offer_render_key(
+        job_offer_doc, get_job_offer_template(job_offer_doc), render_action
+    )
+    job_id = enqueue_pdf_render(
+        "recruitment.backend_code.job_offer.job_offer.render_job_offer",
+        f"job_offer::{render_key}",
+        docname=docname,
+        action=render_action,
+    )
+    return {"status": "Queued", "job_id": job_id}
+
+
+def render_job_offer(docname, action):
+    """PDF queue job that fills the revision cache of a Job Offer."""
+    get_job_offer_render(frappe.get_doc("Job Offer", docname), action)
+
+
+def get_job_offer_pdf_filename(job_offer_doc):
+    if job_offer_doc.custom_employment_type in ["Full-Time", "Intern"]:
+        return f"{job_offer_doc.applicant_name}_job_offer_{job_offer_doc.name}.pdf"
+    return f"{job_offer_doc.applicant_name}_consultant_agreement.pdf"
+
+
+@frappe.whitelist()
+def download_job_offer_pdf(docname, action=None):
+    job_offer_doc = frappe.get_doc("Job Offer", docname)
+    job_offer_doc.check_permission("read")
+    if action == "Send Job Offer":
+        return send_job_offer_pdf(job_offer_doc)
+
+    # Downloads come over GET, whose writes are rolled back; their cache is
+    # filled by the PDF queue (enqueue_job_offer_pdf)
+    content = get_job_offer_render(
+        job_offer_doc, action, write_cache=action != "Download Job Offer"
+    )
+
+    if action == "Preview Job Offer":
+        return content
+    elif action == "Download Job Offer":
+        # Stream the PDF as a file download instead of base64 inside JSON
+        frappe.local.response.filename = get_job_offer_pdf_filename(job_offer_doc)
+        frappe.local.response.filecontent = content
+        frappe.local.response.content_type = "application/pdf"
+        frappe.local.response.type = "download"
+
+
+def send_job_offer_pdf(job_offer_doc):
+    """
+    Mails the offer PDF to the applicant, right away when this revision is
+    cached, otherwise once the PDF queue has rendered it.
+    """
+    pdf = get_job_offer_render(job_offer_doc, "Send Job Offer", cached_only=True)
+    if pdf is not None:
         send_email_with_attachment(job_offer_doc.applicant_email, pdf)
+        frappe.msgprint(_("The job offer PDF has been sent to the applicant's email."))
+        return
+
+    enqueue_pdf_render(
+        "recruitment.backend_code.job_offer.job_offer.render_and_send_job_offer",
+        f"job_offer_send::{job_offer_doc.name}",
+        docname=job_offer_doc.name,
+    )
+    frappe.msgprint(
+        _("The job offer PDF is being generated and will be sent to the applicant's email.")
+    )
+
+
+def render_and_send_job_offer(docname):
+    """PDF queue job behind Send Job Offer on a cache miss."""
+    job_offer_doc = frappe.get_doc("Job Offer", docname)
+    pdf = get_job_offer_render(job_offer_doc, "Send Job Offer")
+    send_email_with_attachment(job_offer_doc.applicant_email, pdf)
 
 
 def send_email_with_attachment(email, pdf):
     """Send the job offer PDF to the applicant's email."""
-    frappe.sendmail(
+    send_mail(
+        "Job Offer PDF",
         recipients=email,
         subject="Job Offer",
         message="Please find your job offer attached.",
@@ -499,7 +671,6 @@ def send_email_with_attachment(email, pdf):
                 "fcontent": pdf,
             }
         ],
-        now=True,
     )
 
 
@@ -530,6 +701,8 @@ def send_joining_reminders():
     if not job_offers:
         frappe.log_error("No job offers found for reminders", "Job Offer Reminder")
         return
+    # The annexure is the same for every offer, so render it once per run
+    pdf = None
     # Process each job offer
     for job in job_offers:
         try:
@@ -537,20 +710,21 @@ def send_joining_reminders():
             joining_date = date_of_joining.strftime(
                 f"{get_day_with_suffix(date_of_joining.day)} %B %Y"
             )
-            html = frappe.render_template(
-                "recruitment/public/js/templates/annexure.html"
-            )
-            pdf = get_pdf(
-                html,
-                {
-                    "margin-left": "10mm",
-                    "margin-right": "10mm",
-                    "margin-top": "10mm",
-                    "margin-bottom": "10mm",
-                },
-            )
+            if pdf is None:
+                html = frappe.render_template(
+                    "recruitment/public/js/templates/annexure.html"
+                )
+                pdf = render_pdf(
+                    html,
+                    {
+                        "margin-left": "10mm",
+                        "margin-right": "10mm",
+                        "margin-top": "10mm",
+                        "margin-bottom": "10mm",
+                    },
+                )
             # Email content preparation
-            message = frappe.render_template(
+            message = render_template(
                 "recruitment/public/js/templates/welcome_reminder.html",
                 {
                     "job": job,
@@ -562,7 +736,8 @@ def send_joining_reminders():
             )
             subject = f" Welcome to {job['company']} - Joining Details"
             # Send email
-            frappe.sendmail(
+            send_mail(
+                "Joining Reminder",
                 recipients=[job["applicant_email"],job['owner']],
                 subject=subject,
                 message=message,
@@ -574,7 +749,6 @@ def send_joining_reminders():
                 ],
                 reference_doctype="Job Offer",
                 reference_name=job["name"],
-                now=True,
             )
         except Exception as e:
             # Log errors
@@ -590,6 +764,8 @@ def job_applicant_update_status(doc, method=None):
         frappe.db.set_value(
             "Job Applicant", doc.job_applicant, "status", "Offer Released"
         )
+        refresh_dedupe_key("Job Applicant", doc.job_applicant)
+        refresh_document_metrics("Job Applicant", doc.job_applicant)
 
 
 @frappe.whitelist()
@@ -602,6 +778,66 @@ def job_applicant_update_status_after_approve(doc, method=None):
         frappe.db.set_value(
             "Job Applicant", doc.job_applicant, "status", "Offer Declined"
         )
+    else:
+        return
+    refresh_dedupe_key("Job Applicant", doc.job_applicant)
+    refresh_document_metrics("Job Applicant", doc.job_applicant)
+
+
+JOB_OFFER_ATTACHMENT_FIELDS = [
+    "resume_attachment",
+    "custom_r1_feedback",
+    "custom_job_description",
+    "custom_r2_feedback",
+    "custom_aadhar_card",
+    "custom_r3_feedback",
+    "custom_other_document",
+]
+# Files beyond this total size are linked in the mail instead of attached
+MAX_JOB_OFFER_ATTACHMENT_SIZE = 10 * 1024 * 1024
+
+
+def get_job_offer_attachments(doc):
+    """
+    Returns the approval mail attachments of a Job Offer as File references and
+    the files that have to be linked instead.
+
+    Attachments are passed as `fid`, so the Email Queue worker reads them when it
+    sends the mail and the web worker never loads the file contents. Fields that
+    point to identical content are attached once.
+    """
+    file_urls = [doc.get(field) for field in JOB_OFFER_ATTACHMENT_FIELDS if doc.get(field)]
+    if not file_urls:
+        return [], []
+
+    files = {}
+    for file in frappe.get_all(
+        "File",
+        filters={"file_url": ["in", file_urls]},
+        fields=["name", "file_url", "file_name", "file_size", "content_hash"],
+        order_by="creation asc",
+    ):
+        files.setdefault(file.file_url, file)
+
+    attachments = []
+    linked_files = []
+    seen = set()
+    total_size = 0
+    for file_url in file_urls:
+        file = files.get(file_url)
+        if not file:
+            continue
+        key = file.content_hash or file.file_url
+        if key in seen:
+            continue
+        seen.add(key)
+
+        if total_size + (file.file_size or 0) > MAX_JOB_OFFER_ATTACHMENT_SIZE:
+            linked_files.append(file)
+            continue
+        total_size += file.file_size or 0
+        attachments.append({"fid": file.name})
+    return attachments, linked_files
 
 
 @frappe.whitelist()
@@ -619,7 +855,7 @@ def handle_workflow_action_for_job_offer(doc_name, action=None, reason=None):
         doc = frappe.get_doc("Job Offer", doc_name)
         # Define the template name based on the action
         if action == "pending_approval_from_director":
-            rendered_content = frappe.render_template(
+            rendered_content = render_template(
                 "recruitment/public/js/templates/internal_document.html", {"doc": doc}
             )
             subject = "Job Offer Approval"
@@ -720,7 +956,7 @@ def handle_workflow_action_for_job_offer(doc_name, action=None, reason=None):
             subject = "Job Offer Pending Approval - Team Lead"
 
             # Render the HTML template with the job offer details
-            rendered_content = frappe.render_template(
+            rendered_content = render_template(
                 "recruitment/public/js/templates/internal_document.html", {"doc": doc}
             )
 
@@ -733,40 +969,19 @@ def handle_workflow_action_for_job_offer(doc_name, action=None, reason=None):
             {rendered_content}
             """
         attachments = []
-
-        attachment_fields = [
-            "resume_attachment",
-            "custom_r1_feedback",
-            "custom_job_description",
-            "custom_r2_feedback",
-            "custom_aadhar_card",
-            "custom_r3_feedback",
-            "custom_other_document",
-        ]
-
-        # Process each attachment field
-        for field in attachment_fields:
-            file_url = doc.get(field)
-            if file_url:
-                file_path = (
-                    frappe.get_site_path("private", file_url.replace("/private/", ""))
-                    if "/private/" in file_url
-                    else frappe.get_site_path(
-                        "public", "files", file_url.replace("/files/", "")
+        if action in ["pending_approval_from_director", "pending_approval_from_tl"]:
+            attachments, linked_files = get_job_offer_attachments(doc)
+            if linked_files:
+                message += "<p>Files too large to attach:</p><ul>{0}</ul>".format(
+                    "".join(
+                        f'<li><a href="{frappe.utils.get_url(file.file_url)}">{file.file_name}</a></li>'
+                        for file in linked_files
                     )
                 )
-                if os.path.exists(file_path):
-                    with open(file_path, "rb") as f:
-                        file_content = f.read()
-                    attachments.append(
-                        {
-                            "fname": os.path.basename(file_url),
-                            "fcontent": file_content,
-                        }
-                    )
 
         # Send the email
-        frappe.sendmail(
+        send_mail(
+            "Job Offer Workflow",
             recipients=get_users_with_role("Team Lead - Talent Acquisition")
             if action != "pending_approval_from_director"
             else [doc.custom_offer_approver,doc.owner],
@@ -774,10 +989,7 @@ def handle_workflow_action_for_job_offer(doc_name, action=None, reason=None):
             message=message,
             reference_doctype="Job Offer",
             reference_name=doc_name,
-            attachments=attachments
-            if action in ["pending_approval_from_director", "pending_approval_from_tl"]
-            else [],
-            now=True,
+            attachments=attachments,
         )
     except Exception as e:
         # Log the error and show a user-friendly message
@@ -787,57 +999,54 @@ def handle_workflow_action_for_job_offer(doc_name, action=None, reason=None):
         frappe.throw("Unable to process the workflow action. Please check the logs.")
 
 
+RESIGNATION_EMAIL_TEMPLATE = "Submission of Resignation Email & Acceptance Letter"
+
+
+def get_pending_job_offer_emails(now, limit, exclude=None):
+    """Job Offers whose scheduled resignation mail is due."""
+    exclude_condition = "AND name NOT IN %(exclude)s" if exclude else ""
+    return frappe.db.sql(
+        f"""
+        SELECT *
+        FROM `tabJob Offer`
+        WHERE custom_email_status = 'Pending'
+        AND custom_email_schedule_time <= %(now)s
+        {exclude_condition}
+        ORDER BY custom_email_schedule_time
+        LIMIT %(limit)s
+    """,
+        {"now": now, "exclude": exclude, "limit": limit},
+        as_dict=True,
+    )
+
+
+def send_job_offer_email(job_offer, cache):
+    """Renders the resignation mail of one Job Offer and adds it to the Email Queue."""
+    subject_template, message_template = get_compiled_email_template(
+        RESIGNATION_EMAIL_TEMPLATE, cache
+    )
+    if "team_leads" not in cache:
+        cache["team_leads"] = get_users_with_role("Team Lead - Talent Acquisition")
+    context = {"doc": job_offer}
+    frappe.sendmail(
+        recipients=[job_offer.applicant_email, job_offer.owner],
+        subject=subject_template.render(context),
+        message=message_template.render(context),
+        reference_doctype="Job Offer",
+        reference_name=job_offer.name,
+        cc=cache["team_leads"],
+        expose_recipients="header",
+    )
+
+
 def send_scheduled_emails_for_job_offer():
     """
     Sends pending workflow emails that were scheduled.
     """
     try:
-        now = now_datetime()
-        # Fetch all Job Applicants where email is pending and scheduled time has passed
-        pending_emails = frappe.get_all(
-            "Job Offer",
-            filters={
-                "custom_email_status": "Pending",
-                "custom_email_schedule_time": ["<=", now],
-            },
-            fields=[
-                "name",
-                "applicant_email",
-                "status",
-                "applicant_email",
-                "custom_email_schedule_time",
-            ],
+        return dispatch_scheduled_emails(
+            "Job Offer", get_pending_job_offer_emails, send_job_offer_email
         )
-        for job_offer in pending_emails:
-            doc = frappe.get_doc("Job Offer", job_offer.name)
-            context = {"doc": doc}
-            subject = frappe.render_template(
-                frappe.get_doc(
-                    "Email Template",
-                    "Submission of Resignation Email & Acceptance Letter",
-                ).subject,
-                context,
-            )
-            message = frappe.render_template(
-                frappe.get_doc(
-                    "Email Template",
-                    "Submission of Resignation Email & Acceptance Letter",
-                ).response,
-                context,
-            )
-            frappe.sendmail(
-                recipients=[doc.applicant_email,doc.owner],
-                subject=subject,
-                message=message,
-                reference_doctype="Job Offer",
-                reference_name=doc.name,
-                cc=get_users_with_role("Team Lead - Talent Acquisition"),
-                expose_recipients="header",
-                now=True,
-            )
-            doc.db_set("custom_email_status", "Sent")
-            doc.save()
-        return f"Processed {len(pending_emails)} pending emails."
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), "Scheduled Email Processing Error")
 
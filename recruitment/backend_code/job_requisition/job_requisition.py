@@ -4,6 +4,7 @@ from frappe.utils.user import get_users_with_role
 from frappe.email.doctype.email_queue.email_queue import SendMailContext
 from frappe.email.smtp import SMTPServer
 from frappe.utils import get_hook_method
+from recruitment.backend_code.outbound_mail.outbound_mail import send_mail
 
 
 @frappe.whitelist()
@@ -90,7 +91,8 @@ def handle_workflow_action(doc_name, action, reason=None):
             doc.save()
 
         # Send the email
-        frappe.sendmail(
+        send_mail(
+            "Job Requisition Workflow",
             recipients=[doc.owner,doc.owner] if action != "pending director approval" else [doc.custom_requisition_approver,doc.owner],
             subject=subject if action == "pending director approval" else frappe.render_template(frappe.get_doc("Email Template", template_name).subject, context),
             cc=get_users_with_role("Manager - Talent Acquisition")+ get_users_with_role("Team Lead - Talent Acquisition"),
@@ -98,7 +100,6 @@ def handle_workflow_action(doc_name, action, reason=None):
             message=message if action == "pending director approval" else frappe.render_template(frappe.get_doc("Email Template", template_name).response, context),
             reference_doctype="Job Requisition",
             reference_name=doc_name,
-            now=True,
         )
     except Exception as e:
         # Log the error and show a user-friendly message
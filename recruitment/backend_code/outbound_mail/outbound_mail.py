@@ -0,0 +1,78 @@
+import time
+
+import frappe
+
+MAIL_LATENCY_KEY = "recruitment_mail_latency"
+
+
+def send_mail(message_type, sync=False, **kwargs):
+    """
+    Sends a mail without putting SMTP on the caller's request.
+
+    The mail is added to the Email Queue and a short background job delivers it
+    once the current transaction commits. Pass `sync=True` (or set
+    `recruitment_sync_mail` in site config) to deliver inline as before.
+    Delivery latency is recorded per `message_type`.
+    """
+    kwargs.pop("now", None)
+    queued_at = time.time()
+
+    if sync or frappe.conf.get("recruitment_sync_mail"):
+        email_queue = frappe.sendmail(now=True, **kwargs)
+        record_mail_latency(message_type, queued_at)
+        return email_queue
+
+    email_queue = frappe.sendmail(**kwargs)
+    if email_queue:
+        frappe.enqueue(
+            deliver_queued_mail,
+            queue="short",
+            email_queue=email_queue.name,
+            message_type=message_type,
+            queued_at=queued_at,
+            enqueue_after_commit=True,
+        )
+    return email_queue
+
+
+def deliver_queued_mail(email_queue, message_type, queued_at):
+    """Background job that sends one Email Queue entry right away."""
+    if not frappe.db.exists("Email Queue", {"name": email_queue, "status": "Not Sent"}):
+        # Already picked up by the regular email queue flush
+        return
+    frappe.get_doc("Email Queue", email_queue).send()
+    record_mail_latency(message_type, queued_at)
+
+
+def record_mail_latency(message_type, queued_at):
+    """Keeps count, average, max and last delivery latency per message type."""
+    latency = time.time() - queued_at
+    stats = frappe.cache().hget(MAIL_LATENCY_KEY, message_type) or {
+        "count": 0,
+        "total_seconds": 0,
+        "max_seconds": 0,
+    }
+    stats["count"] += 1
+    stats["total_seconds"] += latency
+    stats["max_seconds"] = max(stats["max_seconds"], latency)
+    stats["last_seconds"] = latency
+    frappe.cache().hset(MAIL_LATENCY_KEY, message_type, stats)
+
+
+@frappe.whitelist()
+def get_mail_latency_stats():
+    """Delivery latency per message type, in seconds."""
+    frappe.only_for("System Manager")
+    stats = {}
+    for message_type in frappe.cache().hkeys(MAIL_LATENCY_KEY):
+        message_type = frappe.safe_decode(message_type)
+        row = frappe.cache().hget(MAIL_LATENCY_KEY, message_type)
+        if not row:
+            continue
+        stats[message_type] = {
+            "count": row["count"],
+            "average_seconds": round(row["total_seconds"] / row["count"], 3),
+            "max_seconds": round(row["max_seconds"], 3),
+            "last_seconds": round(row["last_seconds"], 3),
+        }
+    return stats
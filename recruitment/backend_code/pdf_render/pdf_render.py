@@ -0,0 +1,113 @@
+import time
+from contextlib import contextmanager
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+from frappe.utils.pdf import get_pdf
+
+PDF_RENDER_EVENT = "recruitment_pdf_render"
+PDF_RENDER_SLOT_KEY = "recruitment_pdf_render_slot"
+
+# Each slot is a lease key with its own expiry, so a slot held by a worker that
+# died while rendering frees itself without affecting the others
+PDF_RENDER_SLOT_TTL = 300
+PDF_RENDER_WAIT_SECONDS = 120
+DEFAULT_MAX_PDF_RENDERS = 2
+
+
+def get_pdf_render_queue():
+    """
+    Queue PDF jobs run on. Point `recruitment_pdf_queue` in site config to a
+    dedicated worker queue (e.g. "pdf") to keep wkhtmltopdf off the long queue.
+    """
+    return frappe.conf.get("recruitment_pdf_queue") or "long"
+
+
+def acquire_pdf_render_slot(cache, limit, token):
+    """Leases the first free slot and returns its key, or None if all are taken."""
+    for slot in range(limit):
+        key = cache.make_key(f"{PDF_RENDER_SLOT_KEY}:{slot}")
+        if cache.set(key, token, nx=True, ex=PDF_RENDER_SLOT_TTL):
+            return key
+    return None
+
+
+@contextmanager
+def pdf_render_slot(wait_seconds=None):
+    """
+    Holds one of `recruitment_max_pdf_renders` wkhtmltopdf slots across workers.
+    Background jobs wait up to PDF_RENDER_WAIT_SECONDS for a slot; web requests
+    fail right away instead of tying up a web worker.
+    """
+    if wait_seconds is None:
+        wait_seconds = 0 if getattr(frappe.local, "request", None) else PDF_RENDER_WAIT_SECONDS
+    cache = frappe.cache()
+    limit = cint(frappe.conf.get("recruitment_max_pdf_renders")) or DEFAULT_MAX_PDF_RENDERS
+    token = frappe.generate_hash(length=12)
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        key = acquire_pdf_render_slot(cache, limit, token)
+        if key:
+            break
+        if time.monotonic() >= deadline:
+            frappe.throw(_("Too many PDFs are being generated. Please try again shortly."))
+        time.sleep(0.5)
+
+    try:
+        yield
+    finally:
+        # Release only our own lease, in case it expired and was taken over
+        if frappe.safe_decode(cache.get(key)) == token:
+            cache.delete(key)
+
+
+def render_pdf(html, options=None, wait_seconds=None):
+    """get_pdf, limited to a few concurrent wkhtmltopdf processes across workers."""
+    with pdf_render_slot(wait_seconds):
+        return get_pdf(html, options=options)
+
+
+def enqueue_pdf_render(render_method, render_key, user=None, **render_kwargs):
+    """
+    Runs `render_method(**render_kwargs)` on the PDF queue and returns the job id.
+    The user is notified over realtime with PDF_RENDER_EVENT when it finishes.
+    Requests for a render that is already queued share the same job.
+    """
+    job_id = f"recruitment_pdf::{render_key}"
+    frappe.enqueue(
+        run_pdf_render,
+        queue=get_pdf_render_queue(),
+        job_id=job_id,
+        deduplicate=True,
+        enqueue_after_commit=True,
+        render_method=render_method,
+        render_job_id=job_id,
+        notify_user=user or frappe.session.user,
+        render_kwargs=render_kwargs,
+    )
+    return job_id
+
+
+def run_pdf_render(render_method, render_job_id, notify_user, render_kwargs):
+    """Background job wrapper that reports the outcome of a render."""
+    frappe.publish_realtime(
+        PDF_RENDER_EVENT, {"job_id": render_job_id, "status": "Started"}, user=notify_user
+    )
+    try:
+        result = frappe.get_attr(render_method)(**render_kwargs)
+    except Exception:
+        frappe.log_error(frappe.get_traceback(), "PDF Render Error")
+        frappe.publish_realtime(
+            PDF_RENDER_EVENT,
+            {"job_id": render_job_id, "status": "Failed"},
+            user=notify_user,
+        )
+        return
+
+    frappe.db.commit()
+    frappe.publish_realtime(
+        PDF_RENDER_EVENT,
+        {"job_id": render_job_id, "status": "Completed", "result": result},
+        user=notify_user,
+    )
@@ -0,0 +1,249 @@
+import frappe
+from frappe.utils import add_days, add_to_date, get_datetime, getdate, now_datetime
+
+METRIC_DOCTYPE = "Recruiter Daily Metric"
+
+# A report day runs from 22:00 of the previous day to 22:00, like the daily report
+REPORT_DAY_OFFSET_HOURS = 2
+
+# Grouped count query per source; each returns recruiter, metric_date and counts
+METRIC_QUERIES = {
+    "Job Applicant": """
+        SELECT owner AS recruiter,
+            DATE(DATE_ADD(creation, INTERVAL {report_day_offset} HOUR)) AS metric_date,
+            COUNT(*) AS job_applicants_count,
+            SUM(status = 'Profile Under Review') AS profile_under_review,
+            SUM(status = 'Candidate Backed Out') AS candidate_backed_out,
+            SUM(status = 'Offer Declined') AS offer_declined,
+            SUM(status = 'Shortlisted') AS shortlisted,
+            SUM(status = 'Joined') AS joiners_count
+        FROM `tabJob Applicant`
+        WHERE creation BETWEEN %(start)s AND %(end)s {recruiter_condition}
+        GROUP BY recruiter, metric_date
+    """,
+    "Interview Detail": """
+        SELECT id.interviewer AS recruiter,
+            DATE(DATE_ADD(i.creation, INTERVAL {report_day_offset} HOUR)) AS metric_date,
+            COUNT(*) AS total_interviews_count
+        FROM `tabInterview Detail` id
+        JOIN `tabInterview` i ON id.parent = i.name
+        WHERE i.creation BETWEEN %(start)s AND %(end)s {recruiter_condition}
+        GROUP BY recruiter, metric_date
+    """,
+    "Interview": """
+        SELECT owner AS recruiter,
+            DATE(DATE_ADD(creation, INTERVAL {report_day_offset} HOUR)) AS metric_date,
+            COUNT(*) AS final_selections_count
+        FROM `tabInterview`
+        WHERE interview_round = 'Round 2'
+        AND status = 'Selected'
+        AND creation BETWEEN %(start)s AND %(end)s {recruiter_condition}
+        GROUP BY recruiter, metric_date
+    """,
+    "Job Offer": """
+        SELECT owner AS recruiter,
+            DATE(DATE_ADD(creation, INTERVAL {report_day_offset} HOUR)) AS metric_date,
+            COUNT(*) AS offers_count
+        FROM `tabJob Offer`
+        WHERE workflow_state = 'Approved'
+        AND creation BETWEEN %(start)s AND %(end)s {recruiter_condition}
+        GROUP BY recruiter, metric_date
+    """,
+}
+
+# Counters owned by each source query
+METRIC_FIELDS = {
+    "Job Applicant": (
+        "job_applicants_count",
+        "profile_under_review",
+        "candidate_backed_out",
+        "offer_declined",
+        "shortlisted",
+        "joiners_count",
+    ),
+    "Interview Detail": ("total_interviews_count",),
+    "Interview": ("final_selections_count",),
+    "Job Offer": ("offers_count",),
+}
+
+RECRUITER_METRICS = tuple(
+    field for fields in METRIC_FIELDS.values() for field in fields
+)
+
+
+def get_metric_date(creation):
+    """Report day a document created at `creation` is counted in."""
+    return getdate(add_to_date(get_datetime(creation), hours=REPORT_DAY_OFFSET_HOURS))
+
+
+def get_report_day_window(from_date, to_date):
+    """Creation timestamps covered by the report days from_date..to_date."""
+    start = add_to_date(
+        get_datetime(getdate(from_date)), hours=-REPORT_DAY_OFFSET_HOURS
+    )
+    end = add_to_date(
+        get_datetime(add_days(getdate(to_date), 1)),
+        hours=-REPORT_DAY_OFFSET_HOURS,
+        seconds=-1,
+    )
+    return start, end
+
+
+def compute_metrics(source, from_date, to_date, recruiters=None):
+    """Runs the grouped count query of one source over a range of report days."""
+    start, end = get_report_day_window(from_date, to_date)
+    values = {"start": start, "end": end, "recruiters": recruiters}
+    recruiter_condition = ""
+    if recruiters:
+        column = "id.interviewer" if source == "Interview Detail" else "owner"
+        recruiter_condition = f"AND {column} IN %(recruiters)s"
+    return frappe.db.sql(
+        METRIC_QUERIES[source].format(
+            recruiter_condition=recruiter_condition,
+            report_day_offset=int(REPORT_DAY_OFFSET_HOURS),
+        ),
+        values,
+        as_dict=True,
+    )
+
+
+def write_metrics(source, buckets, rows):
+    """
+    Stores the counters of one source for every (recruiter, metric_date) bucket;
+    buckets without a row are reset to zero. Each bucket is written with one
+    upsert on the unique (recruiter, metric_date) key, so concurrent refreshes
+    of a new day cannot collide.
+    """
+    counts = {(row.recruiter, getdate(row.metric_date)): row for row in rows}
+    fields = METRIC_FIELDS[source]
+    for bucket in set(buckets) | set(counts):
+        recruiter, metric_date = bucket
+        if not recruiter:
+            continue
+        row = counts.get(bucket, {})
+        values = {field: int(row.get(field) or 0) for field in fields}
+        values.update({"recruiter": recruiter, "metric_date": metric_date})
+        if not any(values[field] for field in fields):
+            # Only reset an existing bucket, never create an empty one
+            frappe.db.sql(
+                f"""
+                UPDATE `tab{METRIC_DOCTYPE}`
+                SET {", ".join(f"{field} = 0" for field in fields)}
+                WHERE recruiter = %(recruiter)s AND metric_date = %(metric_date)s
+                """,
+                values,
+            )
+            continue
+
+        now = now_datetime()
+        values.update(
+            {
+                "name": frappe.generate_hash(length=10),
+                "now": now,
+                "user": frappe.session.user,
+            }
+        )
+        frappe.db.sql(
+            f"""
+            INSERT INTO `tab{METRIC_DOCTYPE}`
+                (name, creation, modified, owner, modified_by, docstatus, idx,
+                recruiter, metric_date, {", ".join(fields)})
+            VALUES
+                (%(name)s, %(now)s, %(now)s, %(user)s, %(user)s, 0, 0,
+                %(recruiter)s, %(metric_date)s, {", ".join(f"%({field})s" for field in fields)})
+            ON DUPLICATE KEY UPDATE {", ".join(f"{field} = VALUES({field})" for field in fields)}
+            """,
+            values,
+        )
+
+
+def refresh_buckets(source, buckets):
+    """Recomputes the counters of one source for the given buckets only."""
+    buckets = {(recruiter, getdate(day)) for recruiter, day in buckets if recruiter}
+    if not buckets:
+        return
+    days = [day for _recruiter, day in buckets]
+    rows = compute_metrics(
+        source,
+        min(days),
+        max(days),
+        recruiters=list({recruiter for recruiter, _day in buckets}),
+    )
+    rows = [row for row in rows if (row.recruiter, getdate(row.metric_date)) in buckets]
+    write_metrics(source, buckets, rows)
+
+
+def update_recruiter_metrics(doc, method=None):
+    """
+    Queues a refresh of the rollup buckets a Job Applicant, Interview or Job
+    Offer counts in, so the save itself never writes the rollup.
+    """
+    if not doc.creation:
+        return
+    interviewers = []
+    if doc.doctype == "Interview":
+        interviewers = {detail.interviewer for detail in doc.get("interview_details")}
+        previous = doc.get_doc_before_save()
+        if previous:
+            interviewers |= {
+                detail.interviewer for detail in previous.get("interview_details")
+            }
+        interviewers = sorted(filter(None, interviewers))
+
+    frappe.enqueue(
+        refresh_recruiter_metrics,
+        queue="short",
+        enqueue_after_commit=True,
+        doctype=doc.doctype,
+        owner=doc.owner,
+        metric_date=str(get_metric_date(doc.creation)),
+        interviewers=interviewers,
+    )
+
+
+def refresh_recruiter_metrics(doctype, owner, metric_date, interviewers=None):
+    """Background job that recomputes the buckets of one saved or deleted document."""
+    metric_date = getdate(metric_date)
+    refresh_buckets(doctype, [(owner, metric_date)])
+    if interviewers:
+        refresh_buckets(
+            "Interview Detail",
+            [(interviewer, metric_date) for interviewer in interviewers],
+        )
+
+
+def refresh_document_metrics(doctype, name):
+    """Refreshes the rollup for a document updated with db_set/set_value."""
+    update_recruiter_metrics(frappe.get_doc(doctype, name))
+
+
+def rebuild_recruiter_metrics(from_date=None, to_date=None, batch_days=7):
+    """
+    Rebuilds the rollup for a range of report days, `batch_days` at a time.
+
+    bench --site <site> execute recruitment.backend_code.recruiter_metrics.recruiter_metrics.rebuild_recruiter_metrics --kwargs "{'from_date': '2025-01-01'}"
+    """
+    to_date = getdate(to_date or now_datetime())
+    if from_date:
+        from_date = getdate(from_date)
+    else:
+        first_creation = frappe.db.sql(
+            "SELECT MIN(creation) FROM `tabJob Applicant`"
+        )[0][0]
+        from_date = get_metric_date(first_creation) if first_creation else to_date
+
+    batch_start = from_date
+    while batch_start <= to_date:
+        batch_end = min(add_days(batch_start, frappe.utils.cint(batch_days) - 1), to_date)
+        existing = frappe.get_all(
+            METRIC_DOCTYPE,
+            filters={"metric_date": ["between", [batch_start, batch_end]]},
+            fields=["recruiter", "metric_date"],
+        )
+        buckets = [(row.recruiter, getdate(row.metric_date)) for row in existing]
+        for source in METRIC_QUERIES:
+            write_metrics(
+                source, buckets, compute_metrics(source, batch_start, batch_end)
+            )
+        frappe.db.commit()
+        batch_start = add_days(batch_end, 1)
@@ -0,0 +1,173 @@
+import hashlib
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, date_diff, get_datetime, getdate
+
+FUNNEL_STAGES = (
+    "applied",
+    "shortlisted",
+    "r1_selected",
+    "r2_selected",
+    "r3_selected",
+    "offer_released",
+    "offer_accepted",
+    "joined",
+)
+
+# Applicant statuses that can only be reached after shortlisting
+SHORTLISTED_STATUSES = (
+    "Shortlisted",
+    "R1 Selected",
+    "R1 Rejected",
+    "R2 Selected",
+    "R2 Rejected",
+    "R3 Selected",
+    "R3 Rejected",
+    "R4 Selected",
+    "R4 Rejected",
+    "Final Rejected",
+    "No Show",
+    "Offer Released",
+    "Offer Accepted",
+    "Offer Declined",
+    "Joined",
+)
+OFFER_RELEASED_STATUSES = ("Offer Released", "Offer Accepted", "Offer Declined", "Joined")
+OFFER_ACCEPTED_STATUSES = ("Offer Accepted", "Joined")
+
+BUCKET_EXPRESSIONS = {
+    "day": "DATE(ja.creation)",
+    "week": "DATE_SUB(DATE(ja.creation), INTERVAL WEEKDAY(ja.creation) DAY)",
+    "month": "DATE_SUB(DATE(ja.creation), INTERVAL DAYOFMONTH(ja.creation) - 1 DAY)",
+}
+GROUP_BY_COLUMNS = {
+    "company": "ja.custom_hiring_company",
+    "department": "ja.custom_department",
+    "recruiter": "ja.owner",
+}
+
+FUNNEL_CACHE_TTL = 15 * 60
+MAX_FUNNEL_DAYS = 400
+
+
+@frappe.whitelist()
+def get_recruitment_funnel(
+    from_date,
+    to_date,
+    bucket="month",
+    group_by=None,
+    hiring_company=None,
+    department=None,
+    recruiter=None,
+):
+    """
+    Returns applicant counts and conversion rates for every funnel stage,
+    bucketed by applicant creation date and optionally grouped by hiring
+    company, department or recruiter.
+    """
+    frappe.only_for(
+        ["Manager - Talent Acquisition", "Team Lead - Talent Acquisition", "System Manager"]
+    )
+
+    if bucket not in BUCKET_EXPRESSIONS:
+        frappe.throw(_("Bucket must be one of {0}").format(", ".join(BUCKET_EXPRESSIONS)))
+    if group_by and group_by not in GROUP_BY_COLUMNS:
+        frappe.throw(_("Group By must be one of {0}").format(", ".join(GROUP_BY_COLUMNS)))
+    if date_diff(to_date, from_date) > MAX_FUNNEL_DAYS:
+        frappe.throw(_("The funnel can cover at most {0} days").format(MAX_FUNNEL_DAYS))
+
+    filters = {
+        "from_date": str(getdate(from_date)),
+        "to_date": str(getdate(to_date)),
+        "bucket": bucket,
+        "group_by": group_by,
+        "hiring_company": hiring_company,
+        "department": department,
+        "recruiter": recruiter,
+    }
+    cache_key = "recruitment_funnel:" + hashlib.sha1(
+        json.dumps(filters, sort_keys=True).encode()
+    ).hexdigest()
+
+    funnel = frappe.cache().get_value(cache_key)
+    if funnel is None:
+        funnel = build_recruitment_funnel(filters)
+        frappe.cache().set_value(cache_key, funnel, expires_in_sec=FUNNEL_CACHE_TTL)
+    return funnel
+
+
+def build_recruitment_funnel(filters):
+    """Computes the funnel with one grouped query over Job Applicant and Interview."""
+    values = {
+        "start": get_datetime(filters["from_date"]),
+        "end": get_datetime(add_days(filters["to_date"], 1)),
+        "shortlisted_statuses": SHORTLISTED_STATUSES,
+        "offer_released_statuses": OFFER_RELEASED_STATUSES,
+        "offer_accepted_statuses": OFFER_ACCEPTED_STATUSES,
+    }
+    conditions = ""
+    for field, column in (
+        ("hiring_company", "ja.custom_hiring_company"),
+        ("department", "ja.custom_department"),
+        ("recruiter", "ja.owner"),
+    ):
+        if filters.get(field):
+            conditions += f" AND {column} = %({field})s"
+            values[field] = filters[field]
+
+    group_column = GROUP_BY_COLUMNS.get(filters.get("group_by")) or "NULL"
+    rows = frappe.db.sql(
+        f"""
+        SELECT
+            {BUCKET_EXPRESSIONS[filters["bucket"]]} AS bucket,
+            {group_column} AS group_value,
+            COUNT(*) AS applied,
+            SUM(ja.status IN %(shortlisted_statuses)s OR ir.job_applicant IS NOT NULL) AS shortlisted,
+            SUM(IFNULL(ir.r1_selected, 0)) AS r1_selected,
+            SUM(IFNULL(ir.r2_selected, 0)) AS r2_selected,
+            SUM(IFNULL(ir.r3_selected, 0)) AS r3_selected,
+            SUM(ja.status IN %(offer_released_statuses)s) AS offer_released,
+            SUM(ja.status IN %(offer_accepted_statuses)s) AS offer_accepted,
+            SUM(ja.status = 'Joined') AS joined
+        FROM `tabJob Applicant` ja
+        LEFT JOIN (
+            SELECT i.job_applicant,
+                MAX(i.interview_round = 'Round 1' AND i.status = 'Selected') AS r1_selected,
+                MAX(i.interview_round = 'Round 2' AND i.status = 'Selected') AS r2_selected,
+                MAX(i.interview_round = 'Round 3' AND i.status = 'Selected') AS r3_selected
+            FROM `tabInterview` i
+            JOIN `tabJob Applicant` a ON a.name = i.job_applicant
+            WHERE i.docstatus = 1
+            AND a.creation >= %(start)s AND a.creation < %(end)s
+            GROUP BY i.job_applicant
+        ) ir ON ir.job_applicant = ja.name
+        WHERE ja.creation >= %(start)s AND ja.creation < %(end)s {conditions}
+        GROUP BY bucket, group_value
+        ORDER BY bucket, group_value
+    """,
+        values,
+        as_dict=True,
+    )
+
+    buckets = []
+    for row in rows:
+        counts = {stage: int(row.get(stage) or 0) for stage in FUNNEL_STAGES}
+        conversion = {}
+        for previous, stage in zip(FUNNEL_STAGES, FUNNEL_STAGES[1:]):
+            conversion[stage] = (
+                round(counts[stage] / counts[previous] * 100, 2) if counts[previous] else 0
+            )
+        buckets.append(
+            {
+                "bucket": str(row.bucket),
+                "group": row.group_value,
+                "counts": counts,
+                "conversion": conversion,
+                "overall_conversion": round(counts["joined"] / counts["applied"] * 100, 2)
+                if counts["applied"]
+                else 0,
+            }
+        )
+    return {"stages": FUNNEL_STAGES, "filters": filters, "buckets": buckets}
@@ -0,0 +1,316 @@
+import ast
+import math
+
+import frappe
+from frappe import _
+
+# Variables seeded by calculate_salary_components before any formula runs
+CONTEXT_VARIABLES = (
+    "ctc",
+    "base",
+    "payment_days",
+    "total_working_days",
+    "custom_pf_type",
+    "custom_additional_pf",
+    "custom_stateprovince_for_pt",
+)
+
+EXCLUDED_EARNINGS = {"Gratuity"}
+EXCLUDED_DEDUCTIONS = {
+    "Income Tax",
+    "Income Tax - 194C",
+    "Income Tax - 194J",
+    "Loan Repayment",
+    "Other Deduction",
+}
+
+FORMULA_VERSION_KEY = "recruitment_salary_formula_version"
+COMPONENT_FORMULAS_KEY = "recruitment_salary_component_formulas"
+STRUCTURE_VERSIONS_KEY = "recruitment_salary_structure_versions"
+
+# Compiled structures live in worker memory, keyed by (site, Salary Structure name)
+# since one worker serves every site of the bench
+_compiled_structures = {}
+
+
+class CompiledSalaryStructure:
+    """
+    A Salary Structure whose formulas are parsed once into code objects and
+    ordered so every component is evaluated after the components it uses.
+    """
+
+    def __init__(self, key, seeds, nodes, order, earnings, deductions):
+        self.key = key
+        self.seeds = seeds
+        self.nodes = nodes
+        self.order = order
+        self.earnings = earnings
+        self.deductions = deductions
+
+    def evaluate(self, context):
+        """Evaluate every formula in a single pass and return raw values per node."""
+        static_context = dict(context)
+        static_context.update(self.seeds)
+        values = {}
+        for key in self.order:
+            constant, chunks, dependencies = self.nodes[key]
+            if chunks is None:
+                values[key] = constant
+                continue
+            namespace = static_context.copy()
+            for name, dependency in dependencies:
+                namespace[name] = values[dependency] if dependency else 0
+            values[key] = evaluate_chunks(chunks, namespace)
+        return static_context, values
+
+    def calculate(self, context):
+        """Return the earnings/deductions breakdown for the given context."""
+        static_context, values = self.evaluate(context)
+        earnings, total_earnings = self.build_rows(
+            self.earnings, static_context, values
+        )
+        deductions, total_deductions = self.build_rows(
+            self.deductions, static_context, values
+        )
+        return {
+            "earnings": earnings,
+            "deductions": deductions,
+            "total_earnings": round(total_earnings, 0),
+            "total_deductions": round(total_deductions, 0),
+        }
+
+    @staticmethod
+    def build_rows(rows, static_context, values):
+        total = 0
+        result = []
+        for salary_component, source, is_statistical in rows:
+            if source is None:
+                value = 0
+            elif isinstance(source, tuple):
+                value = values[source]
+            else:
+                value = static_context[source]
+
+            # Apply ceil and keep 2 decimal places
+            value = math.ceil(value * 100) / 100
+
+            if not is_statistical:
+                total += value
+                result.append({"salary_component": salary_component, "amount": value})
+        return result, total
+
+
+def evaluate_chunks(chunks, namespace):
+    """Evaluate the pre-compiled `AND` chunks of a formula and sum them."""
+    results = []
+    for source, code in chunks:
+        try:
+            if code is None:
+                raise SyntaxError("invalid formula")
+            results.append(eval(code, {"__builtins__": {}}, namespace))
+        except Exception as e:
+            frappe.log_error(
+                f"Error in formula evaluation: {source} - {str(e)}",
+                "Salary Structure Evaluation",
+            )
+            results.append(0)
+    try:
+        return sum(results)
+    except Exception as e:
+        frappe.log_error(
+            f"Error evaluating formula: {' AND '.join(s for s, _c in chunks)} - {str(e)}",
+            "Salary Structure Evaluation",
+        )
+        return 0
+
+
+def compile_formula(formula):
+    """Split a formula on `AND`, compile each chunk and collect the names it reads."""
+    chunks = []
+    names = []
+    for chunk in formula.split("AND"):
+        source = chunk.strip()
+        try:
+            tree = ast.parse(source, mode="eval")
+            code = compile(tree, "<salary formula>", "eval")
+        except SyntaxError:
+            chunks.append((source, None))
+            continue
+        chunks.append((source, code))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and node.id not in names:
+                names.append(node.id)
+    return chunks, names
+
+
+def load_component_formulas():
+    """Load the formula (or amount) of every Salary Component in one query."""
+    formulas = {}
+    for component in frappe.get_all(
+        "Salary Component",
+        fields=["salary_component_abbr", "formula", "amount"],
+        order_by="modified desc",
+    ):
+        if component.salary_component_abbr:
+            formulas.setdefault(
+                component.salary_component_abbr, component.formula or component.amount
+            )
+    return formulas
+
+
+def get_component_formulas():
+    """
+    Map of Salary Component abbreviation to its formula, falling back to its amount.
+    Cached in Redis until a Salary Component changes, and held for the request.
+    """
+    if getattr(frappe.local, "salary_component_formulas", None) is None:
+        frappe.local.salary_component_formulas = frappe.cache().get_value(
+            COMPONENT_FORMULAS_KEY, generator=load_component_formulas
+        )
+    return frappe.local.salary_component_formulas
+
+
+def compile_salary_structure(salary_structure, key=None):
+    """Compile a Salary Structure into a topologically ordered formula graph."""
+    earning_rows = salary_structure.get("earnings", [])
+    deduction_rows = salary_structure.get("deductions", [])
+    rows = {"earnings": {}, "deductions": {}}
+    for section, section_rows in (
+        ("earnings", earning_rows),
+        ("deductions", deduction_rows),
+    ):
+        for row in section_rows:
+            if row.get("abbr"):
+                rows[section].setdefault(row.get("abbr"), row)
+
+    master_formulas = get_component_formulas()
+
+    def get_formula(row, abbr):
+        formula = row.get("formula") if row else None
+        return formula or master_formulas.get(abbr)
+
+    # Components without any formula keep the amount set on the structure row
+    seeds = {}
+    for row in list(earning_rows) + list(deduction_rows):
+        abbr = row.get("abbr")
+        if abbr and not get_formula(row, abbr) and row.get("amount") is not None:
+            seeds[abbr] = row.get("amount")
+
+    def resolve(name, section):
+        """Map a name used by a formula to the node that produces it."""
+        if name in CONTEXT_VARIABLES or name in seeds:
+            return name
+        if name in rows["earnings"]:
+            return ("earnings", name)
+        if section == "deductions":
+            return ("deductions", name)
+        return None
+
+    nodes = {}
+    order = []
+    visiting = set()
+
+    def visit(key):
+        if key in nodes:
+            return
+        if key in visiting:
+            frappe.throw(
+                _("Circular formula dependency on {0} in Salary Structure {1}").format(
+                    frappe.bold(key[1]), frappe.bold(salary_structure.get("name"))
+                ),
+                title=_("Invalid Salary Structure"),
+            )
+        visiting.add(key)
+        section, abbr = key
+        formula = get_formula(rows[section].get(abbr), abbr)
+        if isinstance(formula, (int, float)):
+            nodes[key] = (formula, None, None)
+        elif isinstance(formula, str) and formula.strip():
+            chunks, names = compile_formula(formula)
+            dependencies = []
+            for name in names:
+                source = resolve(name, section)
+                if isinstance(source, str):
+                    continue  # Already part of the static context
+                if source:
+                    visit(source)
+                dependencies.append((name, source))
+            nodes[key] = (None, chunks, dependencies)
+        else:
+            nodes[key] = (0, None, None)
+        visiting.discard(key)
+        order.append(key)
+
+    def output_rows(section_rows, section, excluded):
+        output = []
+        for row in section_rows:
+            salary_component = row.get("salary_component")
+            if salary_component in excluded:
+                continue
+            abbr = row.get("abbr")
+            source = resolve(abbr, section) if abbr else None
+            if isinstance(source, tuple):
+                visit(source)
+            output.append(
+                (salary_component, source, row.get("statistical_component", 0))
+            )
+        return output
+
+    earnings = output_rows(earning_rows, "earnings", EXCLUDED_EARNINGS)
+    deductions = output_rows(deduction_rows, "deductions", EXCLUDED_DEDUCTIONS)
+    return CompiledSalaryStructure(key, seeds, nodes, order, earnings, deductions)
+
+
+def get_formula_version():
+    """Version bumped whenever a Salary Component formula changes on any worker."""
+    return frappe.cache().get_value(FORMULA_VERSION_KEY) or 0
+
+
+def get_structure_version(name):
+    """Version bumped whenever a Salary Structure changes, is renamed or deleted on any worker."""
+    return frappe.cache().hget(STRUCTURE_VERSIONS_KEY, name) or 0
+
+
+def get_compiled_salary_structure(salary_structure):
+    """Return the compiled graph for a Salary Structure, compiling it on first use."""
+    name = salary_structure.get("name")
+    if not name:
+        return compile_salary_structure(salary_structure)
+
+    key = (
+        str(salary_structure.get("modified")),
+        get_structure_version(name),
+        get_formula_version(),
+    )
+    cache_key = (frappe.local.site, name)
+    compiled = _compiled_structures.get(cache_key)
+    if not compiled or compiled.key != key:
+        compiled = compile_salary_structure(salary_structure, key)
+        _compiled_structures[cache_key] = compiled
+    return compiled
+
+
+def clear_salary_structure_cache(doc, method=None):
+    """Drop the compiled graph of a Salary Structure when it is saved or deleted."""
+    bump_structure_version(doc.name)
+
+
+def clear_renamed_salary_structure_cache(doc, method, old, new, merge=False):
+    """Drop the compiled graphs of both names of a renamed Salary Structure."""
+    bump_structure_version(old)
+    bump_structure_version(new)
+
+
+def bump_structure_version(name):
+    """Drops the graph held by this worker and makes every other worker recompile it."""
+    _compiled_structures.pop((frappe.local.site, name), None)
+    frappe.cache().hset(STRUCTURE_VERSIONS_KEY, name, frappe.generate_hash(length=10))
+
+
+def clear_salary_component_cache(doc, method=None):
+    """Invalidate every compiled structure when a Salary Component is saved."""
+    for cache_key in [key for key in _compiled_structures if key[0] == frappe.local.site]:
+        _compiled_structures.pop(cache_key, None)
+    frappe.local.salary_component_formulas = None
+    frappe.cache().delete_value(COMPONENT_FORMULAS_KEY)
+    frappe.cache().set_value(FORMULA_VERSION_KEY, frappe.generate_hash(length=10))
@@ -0,0 +1,195 @@
+import time
+
+import frappe
+from frappe.utils import add_to_date, get_datetime, now_datetime
+
+RETRY_STATE_KEY = "recruitment_scheduled_email_retries"
+STATS_KEY = "recruitment_scheduled_email_stats"
+
+MAX_EMAIL_ATTEMPTS = 5
+# Delay before the first retry; doubled after every further failure
+RETRY_BACKOFF_MINUTES = 10
+# Retry state outlives the longest backoff; losing it only restarts the attempts
+RETRY_STATE_EXPIRY = 24 * 60 * 60
+# custom_email_status of rows that ran out of attempts, so get_pending skips them
+FAILED_STATUS = "Failed"
+
+
+def get_compiled_email_template(template_name, cache):
+    """Compiles the subject and body of an Email Template once per run."""
+    if template_name not in cache:
+        template_doc = frappe.get_doc("Email Template", template_name)
+        jenv = frappe.get_jenv()
+        cache[template_name] = (
+            jenv.from_string(template_doc.subject),
+            jenv.from_string(template_doc.response),
+        )
+    return cache[template_name]
+
+
+def get_retry_state(doctype):
+    """{name: {"attempts", "next_attempt", "error"}} of the rows of a doctype waiting to retry."""
+    return frappe.cache().get_value(f"{RETRY_STATE_KEY}:{doctype}") or {}
+
+
+def set_retry_state(doctype, state):
+    frappe.cache().set_value(
+        f"{RETRY_STATE_KEY}:{doctype}", state, expires_in_sec=RETRY_STATE_EXPIRY
+    )
+
+
+def get_deferred_names(doctype, now):
+    """Rows that are waiting for their backoff to pass."""
+    return [
+        name
+        for name, row in get_retry_state(doctype).items()
+        if get_datetime(row["next_attempt"]) > now
+    ]
+
+
+def record_failure(doctype, name, state):
+    """
+    Counts a failed attempt for a row and schedules its next retry. Returns True
+    once the row has run out of attempts; it then leaves the retry state.
+    """
+    row = state.setdefault(name, {"attempts": 0})
+    row["attempts"] += 1
+    row["next_attempt"] = add_to_date(
+        now_datetime(), minutes=RETRY_BACKOFF_MINUTES * 2 ** (row["attempts"] - 1)
+    )
+    row["error"] = frappe.get_traceback()
+    given_up = row["attempts"] >= MAX_EMAIL_ATTEMPTS
+    title = "Scheduled Email Processing Error"
+    if given_up:
+        title = "Scheduled Email Failed Permanently"
+        state.pop(name)
+    frappe.log_error(f"{doctype} {name}\n\n{row['error']}", title)
+    return given_up
+
+
+def set_email_status(doctype, names, status):
+    if names:
+        frappe.db.sql(
+            f"""
+            UPDATE `tab{doctype}`
+            SET custom_email_status = %(status)s, modified = %(modified)s
+            WHERE name IN %(names)s
+        """,
+            {"status": status, "modified": now_datetime(), "names": names},
+        )
+
+
+def update_stats(doctype, sent, failed, started):
+    """Keeps cumulative and last-run counters of a scheduled email job."""
+    stats = frappe.cache().hget(STATS_KEY, doctype) or {"runs": 0, "sent": 0, "failed": 0}
+    duration = time.monotonic() - started
+    stats.update(
+        {
+            "runs": stats["runs"] + 1,
+            "sent": stats["sent"] + sent,
+            "failed": stats["failed"] + failed,
+            "last_run": str(now_datetime()),
+            "last_run_sent": sent,
+            "last_run_failed": failed,
+            "last_run_seconds": round(duration, 2),
+            "last_run_per_minute": round(sent * 60 / duration, 2) if duration else 0,
+        }
+    )
+    frappe.cache().hset(STATS_KEY, doctype, stats)
+
+
+def dispatch_scheduled_emails(
+    doctype, get_pending, send_email, batch_size=200, max_batches=10
+):
+    """
+    Sends the due scheduled mails of a doctype in batches.
+
+    `get_pending(now, limit, exclude)` returns the next due rows, skipping the
+    names in `exclude`; `send_email(row, cache)` renders and queues the mail of a
+    row. Every row runs inside its own savepoint, so a failing row is rolled back
+    and retried later with backoff without affecting the rest of the batch; after
+    MAX_EMAIL_ATTEMPTS it is marked Failed. Sent rows are marked with one UPDATE
+    and committed per batch together with their Email Queue entries, so a crash
+    never leaves a queued mail marked pending.
+    """
+    started = time.monotonic()
+    now = now_datetime()
+    cache = {}
+    sent = failed = 0
+    state = get_retry_state(doctype)
+
+    for _batch in range(max_batches):
+        rows = get_pending(now, batch_size, get_deferred_names(doctype, now))
+        if not rows:
+            break
+
+        sent_names = []
+        failed_names = []
+        for row in rows:
+            frappe.db.savepoint("scheduled_email")
+            try:
+                send_email(row, cache)
+            except Exception:
+                frappe.db.rollback(save_point="scheduled_email")
+                if record_failure(doctype, row.name, state):
+                    failed_names.append(row.name)
+                failed += 1
+                continue
+            sent_names.append(row.name)
+            state.pop(row.name, None)
+
+        set_email_status(doctype, sent_names, "Sent")
+        set_email_status(doctype, failed_names, FAILED_STATUS)
+        frappe.db.commit()
+        set_retry_state(doctype, state)
+        sent += len(sent_names)
+
+        if len(rows) < batch_size:
+            break
+
+    update_stats(doctype, sent, failed, started)
+    return f"Processed {sent + failed} pending emails: {sent} sent, {failed} failed."
+
+
+@frappe.whitelist()
+def get_scheduled_email_stats():
+    """Throughput, failure counters and retry backlog of the scheduled email jobs."""
+    frappe.only_for("System Manager")
+    stats = {}
+    for doctype in ("Job Applicant", "Job Offer"):
+        retry_state = get_retry_state(doctype)
+        stats[doctype] = {
+            **(frappe.cache().hget(STATS_KEY, doctype) or {}),
+            "retrying": len(retry_state),
+            "given_up": frappe.get_all(
+                doctype,
+                filters={"custom_email_status": FAILED_STATUS},
+                order_by="name",
+                pluck="name",
+            ),
+        }
+    return stats
+
+
+@frappe.whitelist()
+def reset_scheduled_email_retries(doctype, name=None):
+    """Lets rows that ran out of attempts be picked up again by the next run."""
+    frappe.only_for("System Manager")
+    state = get_retry_state(doctype)
+    if name:
+        state.pop(name, None)
+        names = [name]
+    else:
+        state = {}
+        names = frappe.get_all(
+            doctype, filters={"custom_email_status": FAILED_STATUS}, pluck="name"
+        )
+    set_retry_state(doctype, state)
+    frappe.db.sql(
+        f"""
+        UPDATE `tab{doctype}`
+        SET custom_email_status = 'Pending'
+        WHERE custom_email_status = %(status)s AND name IN %(names)s
+    """,
+        {"status": FAILED_STATUS, "names": names or [""]},
+    )
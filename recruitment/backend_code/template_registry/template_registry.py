@@ -0,0 +1,108 @@
+import os
+import time
+
+import frappe
+
+TEMPLATE_RENDER_STATS_KEY = "recruitment_template_render_stats"
+
+# Templates rendered by path across the app, compiled ahead of the first render
+REGISTERED_TEMPLATES = (
+    "recruitment/public/js/templates/with_salary_format.html",
+    "recruitment/public/js/templates/without_salary_format.html",
+    "recruitment/public/js/templates/without_department_format.html",
+    "recruitment/public/js/templates/trainee_offer_format.html",
+    "recruitment/public/js/templates/consultant_agreement.html",
+    "recruitment/public/js/templates/consultant_agreement1.html",
+    "recruitment/public/js/templates/interview.html",
+    "recruitment/public/js/templates/internal_document.html",
+    "recruitment/public/js/templates/welcome_reminder.html",
+)
+
+# Compiled template code lives in worker memory, keyed by template path
+_compiled_templates = {}
+_warmed = False
+
+
+def get_template_file(path):
+    """Absolute file of an app-relative template path such as recruitment/public/..."""
+    app, *parts = path.split("/")
+    return frappe.get_app_path(app, *parts)
+
+
+def get_template(path):
+    """
+    Returns a Jinja template bound to the current environment, compiling its
+    source only once per worker. In developer mode the file is recompiled
+    whenever its mtime changes.
+    """
+    jenv = frappe.get_jenv()
+    compiled = _compiled_templates.get(path)
+    if compiled is None or frappe.conf.developer_mode:
+        filename = get_template_file(path)
+        mtime = os.path.getmtime(filename)
+        if compiled is None or compiled[0] != mtime:
+            with open(filename, encoding="utf-8") as f:
+                source = f.read()
+            compiled = (mtime, jenv.compile(source, path, filename))
+            _compiled_templates[path] = compiled
+
+    # Binding the precompiled code to this request's environment is cheap and
+    # keeps request-specific globals (user, session) fresh
+    return jenv.template_class.from_code(jenv, compiled[1], jenv.make_globals(None))
+
+
+def render_template(path, context=None):
+    """Renders a registered template by path and records its render time."""
+    started = time.perf_counter()
+    html = get_template(path).render(context or {})
+    record_render_time(path, time.perf_counter() - started)
+    return html
+
+
+def record_render_time(path, seconds):
+    """
+    Keeps the render count and total render time per template as Redis hash
+    counters, incremented atomically in a single round trip.
+    """
+    cache = frappe.cache()
+    key = cache.make_key(TEMPLATE_RENDER_STATS_KEY)
+    pipeline = cache.pipeline(transaction=False)
+    pipeline.hincrby(key, f"{path}:count", 1)
+    pipeline.hincrby(key, f"{path}:microseconds", int(seconds * 1_000_000))
+    pipeline.execute()
+
+
+def warm_templates():
+    """Compiles every registered template once per worker (before_request/before_job)."""
+    global _warmed
+    if _warmed:
+        return
+    _warmed = True
+    for path in REGISTERED_TEMPLATES:
+        try:
+            get_template(path)
+        except Exception:
+            frappe.log_error(frappe.get_traceback(), "Template Registry Warm Up Error")
+
+
+@frappe.whitelist()
+def get_template_render_stats():
+    """Render count and average render time per template, in milliseconds."""
+    frappe.only_for("System Manager")
+    cache = frappe.cache()
+    fields = [
+        field
+        for path in REGISTERED_TEMPLATES
+        for field in (f"{path}:count", f"{path}:microseconds")
+    ]
+    values = cache.hmget(cache.make_key(TEMPLATE_RENDER_STATS_KEY), fields)
+    stats = {}
+    for i, path in enumerate(REGISTERED_TEMPLATES):
+        count = int(values[2 * i] or 0)
+        if not count:
+            continue
+        stats[path] = {
+            "count": count,
+            "average_ms": round(int(values[2 * i + 1] or 0) / 1000 / count, 2),
+        }
+    return stats
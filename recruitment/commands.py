@@ -0,0 +1,49 @@
+import click
+import frappe
+from frappe.commands import get_site, pass_context
+
+
+@click.command("recruitment-explain")
+@pass_context
+def recruitment_explain(context):
+    """Run EXPLAIN on the app's hot queries and list the ones that still scan"""
+    from recruitment.backend_code.db_indexes.db_indexes import explain_known_queries
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+    try:
+        report = explain_known_queries()
+    finally:
+        frappe.destroy()
+
+    if not report:
+        click.secho("All known recruitment queries use an index", fg="green")
+        return
+
+    for name, scans in report.items():
+        click.secho(name, fg="yellow")
+        for scan in scans:
+            if "error" in scan:
+                click.echo(f"  error: {scan['error']}")
+            else:
+                click.echo(f"  {scan['table']}: {scan['type']} scan of ~{scan['rows']} rows")
+
+
+@click.command("recruitment-apply-indexes")
+@pass_context
+def recruitment_apply_indexes(context):
+    """Create or repair the composite indexes of the recruitment app"""
+    from recruitment.backend_code.db_indexes.db_indexes import apply_indexes
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+    try:
+        apply_indexes()
+        frappe.db.commit()
+    finally:
+        frappe.destroy()
+
+
+commands = [recruitment_explain, recruitment_apply_indexes]
@@ -15,6 +15,10 @@ doctype_js = {
     "Interview":"public/js/interview.js",
 }
 
+doctype_list_js = {
+    "Job Offer": "public/js/job_offer_list.js",
+}
+
 app_include_js = [
     "/assets/recruitment/js/attach.js",
     ]
@@ -70,6 +74,11 @@ app_include_js = [
 # before_uninstall = "recruitment.uninstall.before_uninstall"
 # after_uninstall = "recruitment.uninstall.after_uninstall"
 
+after_migrate = [
+    "recruitment.permission.permission.clear_all_role_buckets",
+    "recruitment.backend_code.db_indexes.db_indexes.apply_indexes",
+]
+
 # Integration Setup
 # ------------------
 # To set up dependencies/integrations with other apps
@@ -133,19 +142,90 @@ override_doctype_class = {
 doc_events = {
     "Job Applicant":{
         "after_insert":"recruitment.backend_code.job_applicant.job_applicant.send_job_description_to_applicant",
-         "validate":"recruitment.backend_code.job_applicant.job_applicant.validate_duplicates_for_job_applicant"
+         "validate":"recruitment.backend_code.job_applicant.job_applicant.validate_duplicates_for_job_applicant",
+        "on_update":[
+            "recruitment.permission.access.update_document_access",
+            "recruitment.backend_code.recruiter_metrics.recruiter_metrics.update_recruiter_metrics",
+        ],
+        "on_trash":"recruitment.permission.access.remove_document_access",
+        "after_delete":"recruitment.backend_code.recruiter_metrics.recruiter_metrics.update_recruiter_metrics",
     },
     "Job Opening":{
         "validate":"recruitment.backend_code.job_applicant.job_applicant.validate_duplicates_for_job_opening",
+        "on_update":"recruitment.permission.access.update_document_access",
+        "on_trash":"recruitment.permission.access.remove_document_access",
     },
   
     "Job Offer":{
         "on_submit":"recruitment.backend_code.job_offer.job_offer.job_applicant_update_status",
-        "on_update_after_submit":"recruitment.backend_code.job_offer.job_offer.job_applicant_update_status_after_approve",
+        "on_update_after_submit":[
+            "recruitment.backend_code.job_offer.job_offer.job_applicant_update_status_after_approve",
+            "recruitment.permission.access.update_document_access",
+            "recruitment.backend_code.recruiter_metrics.recruiter_metrics.update_recruiter_metrics",
+            "recruitment.backend_code.job_offer.job_offer.clear_job_offer_render_cache",
+        ],
+        "on_update":[
+            "recruitment.permission.access.update_document_access",
+            "recruitment.backend_code.recruiter_metrics.recruiter_metrics.update_recruiter_metrics",
+            "recruitment.backend_code.job_offer.job_offer.clear_job_offer_render_cache",
+        ],
+        "on_trash":[
+            "recruitment.permission.access.remove_document_access",
+            "recruitment.backend_code.job_offer.job_offer.clear_job_offer_render_cache",
+        ],
+        "after_delete":"recruitment.backend_code.recruiter_metrics.recruiter_metrics.update_recruiter_metrics",
     },
     "Interview Feedback":{
         "on_submit":"recruitment.backend_code.interview.interview.send_interview_feedback_notification",
     },
+    "DocShare":{
+        "after_insert":[
+            "recruitment.permission.access.update_reference_access",
+            "recruitment.permission.permission.clear_permission_cache",
+        ],
+        "after_delete":[
+            "recruitment.permission.access.update_reference_access",
+            "recruitment.permission.permission.clear_permission_cache",
+        ],
+    },
+    "ToDo":{
+        "on_update":[
+            "recruitment.permission.access.update_reference_access",
+            "recruitment.permission.permission.clear_permission_cache",
+        ],
+        "after_delete":[
+            "recruitment.permission.access.update_reference_access",
+            "recruitment.permission.permission.clear_permission_cache",
+        ],
+    },
+    "Job Requisition":{
+        "on_update":"recruitment.permission.access.update_document_access",
+        "on_trash":"recruitment.permission.access.remove_document_access",
+    },
+    "Interview":{
+        "on_update":[
+            "recruitment.permission.access.update_document_access",
+            "recruitment.backend_code.recruiter_metrics.recruiter_metrics.update_recruiter_metrics",
+        ],
+        "on_update_after_submit":[
+            "recruitment.permission.access.update_document_access",
+            "recruitment.backend_code.recruiter_metrics.recruiter_metrics.update_recruiter_metrics",
+        ],
+        "on_trash":"recruitment.permission.access.remove_document_access",
+        "after_delete":"recruitment.backend_code.recruiter_metrics.recruiter_metrics.update_recruiter_metrics",
+    },
+    "User":{
+        "on_update":"recruitment.permission.permission.clear_role_buckets",
+    },
+    "Salary Structure":{
+        "on_update":"recruitment.backend_code.salary_structure.salary_structure.clear_salary_structure_cache",
+        "on_trash":"recruitment.backend_code.salary_structure.salary_structure.clear_salary_structure_cache",
+        "after_rename":"recruitment.backend_code.salary_structure.salary_structure.clear_renamed_salary_structure_cache",
+    },
+    "Salary Component":{
+        "on_update":"recruitment.backend_code.salary_structure.salary_structure.clear_salary_component_cache",
+        "on_trash":"recruitment.backend_code.salary_structure.salary_structure.clear_salary_component_cache",
+    },
   
 }
 
@@ -202,11 +282,13 @@ scheduler_events = {
 # ----------------
 # before_request = ["recruitment.utils.before_request"]
 # after_request = ["recruitment.utils.after_request"]
+before_request = ["recruitment.backend_code.template_registry.template_registry.warm_templates"]
 
 # Job Events
 # ----------
 # before_job = ["recruitment.utils.before_job"]
 # after_job = ["recruitment.utils.after_job"]
+before_job = ["recruitment.backend_code.template_registry.template_registry.warm_templates"]
 
 # User Data Protection
 # --------------------
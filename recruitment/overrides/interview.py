@@ -1,11 +1,26 @@
+from itertools import groupby
+
 import frappe
 from frappe import _
 from hrms.hr.doctype.interview.interview import Interview
 from frappe.utils.user import get_users_with_role
-from frappe.utils.pdf import get_pdf
 from frappe.utils.file_manager import save_file
 from frappe.www.printview import get_print_style
-from frappe.utils import get_datetime, now_datetime, add_days
+from frappe.utils import get_datetime, now_datetime, add_days, format_date, get_link_to_form
+from recruitment.backend_code.company_assets.company_assets import get_company_image
+from recruitment.backend_code.interview_feedback.interview_feedback import (
+    get_pending_feedback,
+    validate_feedback_complete,
+)
+from recruitment.backend_code.outbound_mail.outbound_mail import send_mail
+from recruitment.backend_code.pdf_render.pdf_render import (
+    enqueue_pdf_render,
+    render_pdf,
+)
+from recruitment.backend_code.template_registry.template_registry import render_template
+
+# Last feedback digest time per interviewer
+FEEDBACK_REMINDER_DOCTYPE = "Interview Feedback Reminder"
 
 
 class CustomInterview(Interview):
@@ -52,107 +67,36 @@ class CustomInterview(Interview):
                 )
 
             # Ensure feedback is received from all interviewers
-
-            for detail in self.interview_details:
-                if not frappe.db.exists(
-                    "Interview Feedback",
-                    {
-                        "interviewer": detail.interviewer,
-                        "interview": self.name,
-                        "interview_round": self.interview_round,
-                        "job_applicant": self.job_applicant,
-                    },
-                ):
-                    interviewer_name = frappe.db.get_value(
-                        "User", detail.interviewer, "full_name"
-                    )
-                    frappe.throw(
-                        _(
-                            "Interview Feedback is remaining from Interviewer {0}"
-                        ).format(interviewer_name)
-                    )
+            validate_feedback_complete(self.name)
             self.handle_interview_notification()
             self.generate_and_attach_pdf()
 
     def generate_and_attach_pdf(self):
         """
-        Generates an interview evaluation PDF and attaches it to the Job Applicant.
+        Updates the Job Applicant status for this round and queues the interview
+        evaluation PDF, which is attached to the Job Applicant in the background.
         """
-
-        def get_day_with_suffix(day):
-            if 10 <= day <= 20:  # Special case for 11th, 12th, 13th, etc.
-                suffix = "th"
-            else:
-                suffix = {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
-            return f"{day}<sup>{suffix}</sup>"
-
-        # Get interview date and format it
-        schedule_date_format = get_datetime(self.scheduled_on)
-        final_schedule_date = schedule_date_format.strftime(
-            f"{get_day_with_suffix(schedule_date_format.day)} %B %Y"
-        )
-        company_logo_map = {
-            "Mantra Softech": '<img src="/assets/recruitment/images/mantra_header.png"  width="100%" alt="Mantra Technologies Header"/>',
-            "Mefron Technologies": '<img src="/assets/recruitment/images/mefron_header.png"  width="100%" alt="Mefron Technologies Header"/>',
-            "Mewurk Technologies": "",
-            "Mivanta India Pvt Ltd": '<img src="/assets/recruitment/images/mivanta_header.png"  width="100%" alt="Mivanta Technologies Header"/>',
-            "Mupizo Payments": "",
-            "Mocula": '<img src="/assets/recruitment/images/mocula_header.png" width="100%" alt="Mocula Technologies Header"/>',
-            "Mantra Smart Identity": '<img src="/assets/recruitment/images/mantra_identity_header.png" width="100%" alt="Mantra_Identity Technologies Header"/>',
-            "Mitras Global": '<img src="/assets/recruitment/images/mitras_header.png" width="100%" alt="Mitras Technologies Header"/>',
-        }
-        logo_url = company_logo_map.get(
-            frappe.db.get_value(
-                "Job Opening", self.job_opening, "custom_hiring_company"
-            )
-        )
-
-        # Prepare the context for rendering the template
-        context = {
-            "doc": self,  # Interview document
-            "css": get_print_style(),  # Include CSS for print styling
-            "schedule_date": final_schedule_date,
-            "header": logo_url,
-        }
-
-        # Render the HTML template
-        html = frappe.render_template(
-            "recruitment/public/js/templates/interview.html", context
-        )
-
-        # Generate the PDF from the rendered HTML
-        pdf_data = get_pdf(html)
-
-        # Define the file name based on the interview round
-        round_label = self.interview_round.replace(
-            " ", "_"
-        )  # Replace spaces with underscores
-        file_name = f"Interview_Evaluation_{round_label}.pdf"
-
-        # Save the PDF file in the system
-        saved_file = save_file(
-            file_name, pdf_data, "Job Applicant", self.job_applicant, is_private=0
-        )
-
-        # Attach the PDF file to the Job Applicant doctype
         job_applicant_doc = frappe.get_doc("Job Applicant", self.job_applicant)
         if self.interview_round == "Round 1":
-            job_applicant_doc.custom_r1_feedback = saved_file.file_url
             job_applicant_doc.status = (
                 "R1 Selected" if self.status == "Selected" else "R1 Rejected"
             )
         elif self.interview_round == "Round 2":
-            job_applicant_doc.custom_r2_feedback = saved_file.file_url
             job_applicant_doc.status = (
                 "R2 Selected" if self.status == "Selected" else "R2 Rejected"
             )
         elif self.interview_round == "Round 3":
-            job_applicant_doc.custom_r3_feedback = saved_file.file_url
             job_applicant_doc.status = (
                 "R3 Selected" if self.status == "Selected" else "R3 Rejected"
             )
         job_applicant_doc.save(ignore_permissions=True)
 
+        enqueue_pdf_render(
+            "recruitment.overrides.interview.attach_interview_evaluation_pdf",
+            f"interview_evaluation::{self.name}",
+            interview=self.name,
+        )
+
     def handle_interview_notification(self):
         """
         Handles email notifications for interview status updates.
@@ -190,7 +134,8 @@ class CustomInterview(Interview):
                 message = frappe.render_template(template_doc.response, context)
 
                 # Send the email
-                frappe.sendmail(
+                send_mail(
+                    "Interview Notification",
                     recipients=[email_id,self.owner],
                     subject=subject,
                     message=message,
@@ -198,7 +143,6 @@ class CustomInterview(Interview):
                     reference_name=self.name,
                     cc=get_users_with_role("Team Lead - Talent Acquisition"),
                     expose_recipients="header",
-                    now=True,
                 )
 
         except Exception as e:
@@ -240,64 +184,177 @@ class CustomInterview(Interview):
         )
 
 
-def send_feedback_reminder():
-    """Send interview feedback reminders every 24 hours if feedback is not submitted"""
-
-    # Get all interviews with status 'Pending'
-    interviews = frappe.get_all(
-        "Interview",
-        filters={"status": "Pending"},
-        fields=[
-            "name",
-            "job_applicant",
-            "interview_round",
-            "creation",
-            "custom_last_reminder_sent",
-        ],
+def attach_interview_evaluation_pdf(interview):
+    """
+    PDF queue job that generates the interview evaluation PDF and attaches it to
+    the Job Applicant as the feedback of the interview round.
+    """
+    doc = frappe.get_doc("Interview", interview)
+
+    def get_day_with_suffix(day):
+        if 10 <= day <= 20:  # Special case for 11th, 12th, 13th, etc.
+            suffix = "th"
+        else:
+            suffix = {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+        return f"{day}<sup>{suffix}</sup>"
+
+    # Get interview date and format it
+    schedule_date_format = get_datetime(doc.scheduled_on)
+    final_schedule_date = schedule_date_format.strftime(
+        f"{get_day_with_suffix(schedule_date_format.day)} %B %Y"
+    )
+    # Header images are inlined so wkhtmltopdf does not fetch them
+    company_header_map = {
+        "Mantra Softech": ("mantra", "Mantra Technologies Header"),
+        "Mefron Technologies": ("mefron", "Mefron Technologies Header"),
+        "Mewurk Technologies": (None, ""),
+        "Mivanta India Pvt Ltd": ("mivanta", "Mivanta Technologies Header"),
+        "Mupizo Payments": (None, ""),
+        "Mocula": ("mocula", "Mocula Technologies Header"),
+        "Mantra Smart Identity": ("mantra_identity", "Mantra_Identity Technologies Header"),
+        "Mitras Global": ("mitras", "Mitras Technologies Header"),
+    }
+    asset_key, alt = company_header_map.get(
+        frappe.db.get_value("Job Opening", doc.job_opening, "custom_hiring_company"),
+        (None, ""),
+    )
+    logo_url = get_company_image(asset_key, "header", alt)
+
+    # Prepare the context for rendering the template
+    context = {
+        "doc": doc,  # Interview document
+        "css": get_print_style(),  # Include CSS for print styling
+        "schedule_date": final_schedule_date,
+        "header": logo_url,
+    }
+
+    # Render the HTML template
+    html = render_template(
+        "recruitment/public/js/templates/interview.html", context
     )
 
-    now = now_datetime()
+    # Generate the PDF from the rendered HTML
+    pdf_data = render_pdf(html)
+
+    # Define the file name based on the interview round
+    round_label = doc.interview_round.replace(" ", "_")  # Replace spaces with underscores
+    file_name = f"Interview_Evaluation_{round_label}.pdf"
 
-    for interview in interviews:
-        interview_details = frappe.get_all(
-            "Interview Detail",
-            filters={"parent": interview.name},
-            fields=["name", "interviewer"],
+    # Save the PDF file in the system
+    saved_file = save_file(
+        file_name, pdf_data, "Job Applicant", doc.job_applicant, is_private=0
+    )
+
+    # Link the PDF as the feedback of this round on the Job Applicant
+    feedback_field = {
+        "Round 1": "custom_r1_feedback",
+        "Round 2": "custom_r2_feedback",
+        "Round 3": "custom_r3_feedback",
+    }.get(doc.interview_round)
+    if feedback_field:
+        frappe.db.set_value(
+            "Job Applicant", doc.job_applicant, feedback_field, saved_file.file_url
         )
+    return {"file_url": saved_file.file_url, "file_name": file_name}
 
-        for detail in interview_details:
-            feedback_exists = frappe.db.exists(
-                "Interview Feedback",
-                {
-                    "interview": interview.name,
-                    "interviewer": detail.interviewer,
-                    "job_applicant": interview.job_applicant,
-                    "interview_round": interview.interview_round,
-                },
-            )
 
-            if not feedback_exists:
-                custom_last_reminder_sent = interview.custom_last_reminder_sent
+def send_feedback_reminder():
+    """
+    Sends every interviewer one digest of their pending interviews without
+    feedback, at most once every 24 hours per interviewer.
+    """
+    pending = get_pending_feedback()
+    if not pending:
+        return
 
-                # Send reminder if never sent or if 24 hours have passed since the last reminder
-                if not custom_last_reminder_sent or (
-                    get_datetime(custom_last_reminder_sent) <= add_days(now, -1)
-                ):
-                    send_feedback_email(interview.name, detail.interviewer)
+    now = now_datetime()
+    # Last digest time per interviewer, read once per run
+    last_sent = dict(
+        frappe.get_all(
+            FEEDBACK_REMINDER_DOCTYPE,
+            filters={"interviewer": ["in", list({row.interviewer for row in pending})]},
+            fields=["interviewer", "last_reminder_sent"],
+            as_list=True,
+        )
+    )
+    reminded_interviewers = []
+    reminded_interviews = set()
+
+    for interviewer, rows in groupby(pending, key=lambda row: row.interviewer):
+        rows = list(rows)
+        if last_sent.get(interviewer) and get_datetime(last_sent[interviewer]) > add_days(
+            now, -1
+        ):
+            continue
+        try:
+            send_feedback_digest(interviewer, rows)
+        except Exception:
+            frappe.log_error(frappe.get_traceback(), "Interview Feedback Reminder Error")
+            continue
+        reminded_interviewers.append(interviewer)
+        reminded_interviews.update(row.interview for row in rows)
+
+    if reminded_interviewers:
+        # One upsert for every interviewer reminded in this run
+        frappe.db.sql(
+            f"""
+            INSERT INTO `tab{FEEDBACK_REMINDER_DOCTYPE}`
+                (name, interviewer, last_reminder_sent, creation, modified, owner, modified_by)
+            VALUES {", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(reminded_interviewers))}
+            ON DUPLICATE KEY UPDATE
+                last_reminder_sent = VALUES(last_reminder_sent), modified = VALUES(modified)
+            """,
+            [
+                value
+                for interviewer in reminded_interviewers
+                for value in (
+                    interviewer,
+                    interviewer,
+                    now,
+                    now,
+                    now,
+                    "Administrator",
+                    "Administrator",
+                )
+            ],
+        )
 
-                    # Update the custom_last_reminder_sent timestamp in Interview doctype
-                    frappe.db.set_value(
-                        "Interview", interview.name, "custom_last_reminder_sent", now
-                    )
+    if reminded_interviews:
+        frappe.db.sql(
+            """
+            UPDATE `tabInterview`
+            SET custom_last_reminder_sent = %(now)s
+            WHERE name IN %(interviews)s
+            """,
+            {"now": now, "interviews": list(reminded_interviews)},
+        )
 
 
-def send_feedback_email(interview_name, interviewer):
-    """Helper function to send email reminders for interview feedback"""
-    interviewer_name = frappe.db.get_value("User", interviewer, "full_name")
-    subject = "Reminder: Submit Interview Feedback"
+def send_feedback_digest(interviewer, rows):
+    """Helper function to send one interviewer the list of interviews awaiting their feedback"""
+    interviewer_name = rows[0].full_name or interviewer
+    interview_rows = "".join(
+        f"""
+            <tr>
+                <td style="border: 1px solid #ddd; padding: 6px;">{get_link_to_form("Interview", row.interview)}</td>
+                <td style="border: 1px solid #ddd; padding: 6px;">{frappe.utils.escape_html(row.applicant_name or row.job_applicant or "")}</td>
+                <td style="border: 1px solid #ddd; padding: 6px;">{row.interview_round or ""}</td>
+                <td style="border: 1px solid #ddd; padding: 6px;">{format_date(row.scheduled_on) if row.scheduled_on else ""}</td>
+            </tr>"""
+        for row in rows
+    )
+    subject = "Reminder: Submit Interview Feedback ({0} pending)".format(len(rows))
     message = f"""
             <p>Dear {interviewer_name},</p>
-            <p>This is a reminder to submit your feedback for the interview: <b>{interview_name}</b>.</p>
+            <p>This is a reminder to submit your feedback for the following interviews:</p>
+            <table style="border-collapse: collapse;">
+                <tr>
+                    <th style="border: 1px solid #ddd; padding: 6px;">Interview</th>
+                    <th style="border: 1px solid #ddd; padding: 6px;">Applicant</th>
+                    <th style="border: 1px solid #ddd; padding: 6px;">Round</th>
+                    <th style="border: 1px solid #ddd; padding: 6px;">Scheduled On</th>
+                </tr>{interview_rows}
+            </table>
             <p>Please ensure you provide your feedback as soon as possible.</p>
             <p>Thank you.</p>
         """
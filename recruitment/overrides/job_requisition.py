@@ -1,6 +1,7 @@
 import frappe
 from frappe import _
 from hrms.hr.doctype.job_requisition.job_requisition import JobRequisition
+from recruitment.backend_code.dedupe_key.dedupe_key import apply_dedupe_key
 
 
 class CustomJobRequisition(JobRequisition):
@@ -9,17 +10,7 @@ class CustomJobRequisition(JobRequisition):
         self.validate_duplicates()
 
     def validate_duplicates(self):
-        duplicate = frappe.db.exists(
-            "Job Requisition",
-            {
-                "designation": self.designation,
-                "department": self.department,
-                "status": ("not in", ["Cancelled", "Filled"]),
-                "name": ("!=", self.name),
-                "custom_requisition_type": self.custom_requisition_type,
-                "custom_hiring_company": self.custom_hiring_company,
-            },
-        )
+        duplicate = apply_dedupe_key(self)["hard"]
 
         if duplicate:
             frappe.throw(
@@ -0,0 +1,14 @@
+from frappe.modules.utils import sync_customizations
+
+from recruitment.backend_code.dedupe_key.dedupe_key import (
+    DEDUPE_RULES,
+    populate_dedupe_keys,
+)
+
+
+def execute():
+    # Custom fields are synced after post_model_sync patches; the dedupe
+    # columns have to exist before they can be backfilled
+    sync_customizations("recruitment")
+    for doctype in DEDUPE_RULES:
+        populate_dedupe_keys(doctype)
@@ -0,0 +1,7 @@
+from recruitment.backend_code.recruiter_metrics.recruiter_metrics import (
+    rebuild_recruiter_metrics,
+)
+
+
+def execute():
+    rebuild_recruiter_metrics()
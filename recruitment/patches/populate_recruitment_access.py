@@ -0,0 +1,5 @@
+from recruitment.permission.access import rebuild_access_table
+
+
+def execute():
+    rebuild_access_table()
@@ -0,0 +1,244 @@
+import json
+import time
+
+import frappe
+from frappe.utils import now
+
+ACCESS_DOCTYPE = "Recruitment Access"
+TRACKED_DOCTYPES = (
+    "Job Opening",
+    "Job Applicant",
+    "Job Requisition",
+    "Job Offer",
+    "Interview",
+)
+
+
+def get_access_rows(doctype, names):
+    """
+    Returns (user, document name, access source) for every user that can see the
+    given records through an assignment, a share, an interview panel or by being
+    the hiring manager.
+    """
+    if not names:
+        return []
+
+    rows = set()
+    columns = ["name", "_assign"]
+    if doctype == "Job Opening":
+        columns.append("custom_hiring_manager")
+    documents = frappe.db.sql(
+        f"""
+        SELECT {", ".join(f"`{column}`" for column in columns)}
+        FROM `tab{doctype}`
+        WHERE name IN %(names)s
+    """,
+        {"names": names},
+        as_dict=True,
+    )
+
+    for document in documents:
+        for user in json.loads(document._assign or "[]"):
+            rows.add((user, document.name, "Assigned"))
+        if document.get("custom_hiring_manager"):
+            rows.add((document.custom_hiring_manager, document.name, "Hiring Manager"))
+
+    for share in frappe.get_all(
+        "DocShare",
+        filters={"share_doctype": doctype, "share_name": ["in", names]},
+        fields=["share_name", "user"],
+    ):
+        if share.user:
+            rows.add((share.user, share.share_name, "Shared"))
+
+    if doctype == "Interview":
+        for detail in frappe.get_all(
+            "Interview Detail",
+            filters={"parenttype": "Interview", "parent": ["in", names]},
+            fields=["parent", "interviewer"],
+        ):
+            if detail.interviewer:
+                rows.add((detail.interviewer, detail.parent, "Interviewer"))
+
+    if doctype == "Job Applicant":
+        # Hiring managers see applicants of their openings once approved
+        for applicant in frappe.db.sql(
+            """
+            SELECT ja.name, jo.custom_hiring_manager
+            FROM `tabJob Applicant` ja
+            JOIN `tabJob Opening` jo ON jo.name = ja.job_title
+            WHERE ja.name IN %(names)s
+            AND ja.workflow_state = 'Approved'
+            AND IFNULL(jo.custom_hiring_manager, '') != ''
+        """,
+            {"names": names},
+            as_dict=True,
+        ):
+            rows.add((applicant.custom_hiring_manager, applicant.name, "Hiring Manager"))
+
+    return sorted(rows)
+
+
+def sync_access(doctype, names):
+    """Replaces the access rows of the given records with freshly computed ones."""
+    if doctype not in TRACKED_DOCTYPES or not names:
+        return
+
+    frappe.db.delete(
+        ACCESS_DOCTYPE, {"reference_doctype": doctype, "reference_name": ["in", names]}
+    )
+    timestamp = now()
+    values = [
+        (
+            frappe.generate_hash(length=10),
+            timestamp,
+            timestamp,
+            "Administrator",
+            "Administrator",
+            user,
+            doctype,
+            name,
+            source,
+        )
+        for user, name, source in get_access_rows(doctype, names)
+    ]
+    if values:
+        frappe.db.bulk_insert(
+            ACCESS_DOCTYPE,
+            fields=[
+                "name",
+                "creation",
+                "modified",
+                "owner",
+                "modified_by",
+                "user",
+                "reference_doctype",
+                "reference_name",
+                "access_source",
+            ],
+            values=values,
+        )
+
+
+def update_document_access(doc, method=None):
+    """Refreshes the access rows of a tracked document after it is saved."""
+    sync_access(doc.doctype, [doc.name])
+
+    # Applicants inherit the hiring manager of their Job Opening
+    if doc.doctype == "Job Opening" and doc.has_value_changed("custom_hiring_manager"):
+        frappe.enqueue(
+            sync_job_opening_applicants,
+            queue="long",
+            job_opening=doc.name,
+            enqueue_after_commit=True,
+        )
+
+
+def remove_document_access(doc, method=None):
+    """Drops the access rows of a tracked document that is being deleted."""
+    frappe.db.delete(
+        ACCESS_DOCTYPE, {"reference_doctype": doc.doctype, "reference_name": doc.name}
+    )
+
+
+def update_reference_access(doc, method=None):
+    """Refreshes the referenced document when a ToDo or DocShare changes."""
+    if doc.doctype == "ToDo":
+        doctype, name = doc.reference_type, doc.reference_name
+    else:
+        doctype, name = doc.share_doctype, doc.share_name
+    if doctype in TRACKED_DOCTYPES and name:
+        sync_access(doctype, [name])
+
+
+def sync_job_opening_applicants(job_opening, batch_size=500):
+    """Resyncs every applicant of a Job Opening after its hiring manager changed."""
+    applicants = frappe.get_all(
+        "Job Applicant", filters={"job_title": job_opening}, pluck="name"
+    )
+    for start in range(0, len(applicants), batch_size):
+        sync_access("Job Applicant", applicants[start : start + batch_size])
+        frappe.db.commit()
+
+
+def rebuild_access_table(doctypes=None, batch_size=500):
+    """
+    Rebuilds the access table from assignments, shares, interview panels and
+    hiring managers, in batches of `batch_size` records.
+
+    bench --site <site> execute recruitment.permission.access.rebuild_access_table
+    """
+    for doctype in frappe.parse_json(doctypes) or TRACKED_DOCTYPES:
+        names = frappe.get_all(doctype, pluck="name", order_by="name")
+        for start in range(0, len(names), batch_size):
+            sync_access(doctype, names[start : start + batch_size])
+            frappe.db.commit()
+
+
+def get_legacy_permission_condition(user, doctype):
+    """Condition used before the access table existed, kept for benchmarking."""
+    assigned = f"JSON_CONTAINS(_assign, '\"{user}\"')"
+    shared = f"""
+        EXISTS (
+            SELECT 1 FROM `tabDocShare` ds
+            WHERE ds.share_doctype = '{doctype}'
+            AND ds.share_name = `tab{doctype}`.name
+            AND ds.user = '{user}'
+        )
+    """
+    if doctype == "Job Applicant":
+        return f"""
+            (
+                job_title IN (
+                    SELECT name FROM `tabJob Opening`
+                    WHERE custom_hiring_manager = '{user}'
+                )
+                AND workflow_state = 'Approved'
+            )
+            OR {assigned} OR {shared}
+        """
+    if doctype == "Interview":
+        return f"""
+            EXISTS (
+                SELECT 1 FROM `tabInterview Detail` id
+                WHERE id.parent = `tabInterview`.name
+                AND id.interviewer = '{user}'
+            )
+            OR {assigned} OR {shared}
+        """
+    if doctype == "Job Opening":
+        return f"custom_hiring_manager = '{user}' OR {assigned} OR {shared}"
+    return f"({assigned} OR {shared})"
+
+
+def benchmark_list_permissions(user, doctype="Job Applicant", iterations=10):
+    """
+    Compares list and count latency of the legacy permission condition with the
+    access table condition for a restricted user.
+
+    bench --site <site> execute recruitment.permission.access.benchmark_list_permissions --kwargs "{'user': 'hm@example.com'}"
+    """
+    from recruitment.permission.permission import get_access_condition
+
+    conditions = {
+        "legacy": get_legacy_permission_condition(user, doctype),
+        "access_table": get_access_condition(user, doctype),
+    }
+    queries = {
+        "count": "SELECT COUNT(*) FROM `tab{doctype}` WHERE ({condition})",
+        "list": """
+            SELECT name FROM `tab{doctype}` WHERE ({condition})
+            ORDER BY modified DESC LIMIT 20
+        """,
+    }
+
+    results = {}
+    for label, condition in conditions.items():
+        for query_name, query in queries.items():
+            sql = query.format(doctype=doctype, condition=condition)
+            start = time.perf_counter()
+            for _i in range(frappe.utils.cint(iterations)):
+                frappe.db.sql(sql)
+            elapsed = (time.perf_counter() - start) * 1000 / frappe.utils.cint(iterations)
+            results[f"{label}_{query_name}_ms"] = round(elapsed, 2)
+    return results
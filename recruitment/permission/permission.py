@@ -1,4 +1,58 @@
 import frappe
+
+# Roles that get unrestricted access to each doctype
+ROLE_PERMISSIONS = {
+    "Job Opening": ["Manager - Talent Acquisition", "Team Lead - Talent Acquisition"],
+    "Job Applicant": ["Talent Acquisition Executive", "Manager - Talent Acquisition", "Team Lead - Talent Acquisition"],
+    "Job Requisition": ["Manager - Talent Acquisition", "Hiring Manager","Team Lead - Talent Acquisition","Job Requisition Approver"],
+    "Interview":["Team Lead - Talent Acquisition","Talent Acquisition Executive","Manager - Talent Acquisition","Hiring Manager"],
+    "Job Offer":["Talent Acquisition Executive", "Manager - Talent Acquisition", "Team Lead - Talent Acquisition","Job Offer Approver","HR OPS User"],
+    "Interview Feedback":["Interviewer","Hiring Manager"]
+}
+
+ROLE_BUCKETS_KEY = "recruitment_role_buckets"
+
+
+def get_request_cache(key):
+    """Returns a dict stored on frappe.local, so it lives for the current request only."""
+    cache = getattr(frappe.local, "recruitment_permission_cache", None)
+    if cache is None:
+        cache = frappe.local.recruitment_permission_cache = {}
+    return cache.setdefault(key, {})
+
+
+def get_role_buckets(user):
+    """
+    Returns {doctype: True if unrestricted else False} for a user, built from
+    ROLE_PERMISSIONS and cached in Redis until the user's roles change.
+    """
+
+    def build_role_buckets():
+        user_roles = set(frappe.get_roles(user))
+        return {
+            doctype: any(role in user_roles for role in roles)
+            for doctype, roles in ROLE_PERMISSIONS.items()
+        }
+
+    return frappe.cache().hget(ROLE_BUCKETS_KEY, user, generator=build_role_buckets)
+
+
+def is_unrestricted(user, doctype):
+    """Whether the user holds one of the roles that can see every record of the doctype."""
+    return get_role_buckets(user).get(doctype, False)
+
+
+def clear_role_buckets(doc, method=None):
+    """Drops the cached role buckets of a User when it is saved, e.g. after a role change."""
+    frappe.cache().hdel(ROLE_BUCKETS_KEY, doc.name)
+    clear_permission_cache()
+
+
+def clear_all_role_buckets():
+    """Drops every cached role bucket, e.g. after ROLE_PERMISSIONS changed on migrate."""
+    frappe.cache().delete_value(ROLE_BUCKETS_KEY)
+
+
 def permission_query_condition(user,doctype=None):
     """Returns permission conditions dynamically based on the user's roles and the doctype."""
     user = user or frappe.session.user
@@ -7,77 +61,76 @@ def permission_query_condition(user,doctype=None):
     if user == "Administrator":
         return ""
 
-    # Define allowed roles for each doctype
-    role_permissions = {
-        "Job Opening": ["Manager - Talent Acquisition", "Team Lead - Talent Acquisition"],
-        "Job Applicant": ["Talent Acquisition Executive", "Manager - Talent Acquisition", "Team Lead - Talent Acquisition"],
-        "Job Requisition": ["Manager - Talent Acquisition", "Hiring Manager","Team Lead - Talent Acquisition","Job Requisition Approver"],
-        "Interview":["Team Lead - Talent Acquisition","Talent Acquisition Executive","Manager - Talent Acquisition","Hiring Manager"],
-        "Job Offer":["Talent Acquisition Executive", "Manager - Talent Acquisition", "Team Lead - Talent Acquisition","Job Offer Approver","HR OPS User"],
-        "Interview Feedback":["Interviewer","Hiring Manager"]
-    }
-
-    allowed_roles = role_permissions.get(doctype, [])  # Get allowed roles for the given doctype
-    user_roles = frappe.get_roles(user)
-
     # Grant access if the user has at least one allowed role
-    if any(role in user_roles for role in allowed_roles):
+    if is_unrestricted(user, doctype):
         return ""
-    if doctype == "Job Applicant":
-        return f"""
-            (
-                job_title IN ( 
-                    SELECT name FROM `tabJob Opening` 
-                    WHERE custom_hiring_manager = '{user}'
+
+    # Restrict access to records the user was assigned, shared, put on the
+    # interview panel of, or is hiring manager for (see permission/access.py)
+    return get_access_condition(user, doctype)
+
+
+def get_access_condition(user, doctype):
+    """Indexed semi-join against the precomputed Recruitment Access table."""
+    return f"""
+        `tab{doctype}`.name IN (
+            SELECT ra.reference_name FROM `tabRecruitment Access` ra
+            WHERE ra.user = {frappe.db.escape(user)}
+            AND ra.reference_doctype = {frappe.db.escape(doctype)}
+        )
+    """
+
+
+def get_permitted_names(doctype, names, user=None):
+    """
+    Returns the subset of `names` the user may read, checking every name not yet
+    resolved in this request with a single query.
+    """
+    user = user or frappe.session.user
+    results = get_request_cache("documents")
+    pending = [name for name in set(names) if (user, doctype, name) not in results]
+
+    if pending:
+        if user == "Administrator" or is_unrestricted(user, doctype):
+            permitted = set(pending)
+        else:
+            condition = permission_query_condition(user, doctype)
+            permitted = set(
+                frappe.db.sql_list(
+                    f"""
+                    SELECT name
+                    FROM `tab{doctype}`
+                    WHERE ({condition}) AND name IN %(names)s
+                """,
+                    {"names": pending},
                 )
-                AND workflow_state = 'Approved'
-            )
-            OR JSON_CONTAINS(_assign, '\"{user}\"')
-            OR EXISTS (
-                SELECT 1 FROM `tabDocShare` ds 
-                WHERE ds.share_doctype = 'Job Applicant'
-                AND ds.share_name = `tabJob Applicant`.name
-                AND ds.user = '{user}'
-            )
-        """
-    if doctype == "Interview":
-        return f"""
-            EXISTS (
-                SELECT 1 FROM `tabInterview Detail` id 
-                WHERE id.parent = `tabInterview`.name
-                AND id.interviewer = '{user}'
             )
-            OR JSON_CONTAINS(_assign, '\"{user}\"')
-            OR EXISTS (
-                SELECT 1 FROM `tabDocShare` ds 
-                WHERE ds.share_doctype = 'Interview'
-                AND ds.share_name = `tabInterview`.name
-                AND ds.user = '{user}'
-            )
-        """
-    if doctype == "Job Opening":
-        return f"""
-            custom_hiring_manager = '{user}'
-            OR JSON_CONTAINS(_assign, '\"{user}\"')
-            OR EXISTS (
-                SELECT 1 FROM `tabDocShare` ds 
-                WHERE ds.share_doctype = 'Job Opening'
-                AND ds.share_name = `tabJob Opening`.name
-                AND ds.user = '{user}'
-            )
-            """
-    assigned_condition = f"JSON_CONTAINS(_assign, '\"{user}\"')"
-    shared_condition = f"""
-        EXISTS (
-            SELECT 1 FROM `tabDocShare` ds 
-            WHERE ds.share_doctype = '{doctype}'
-            AND ds.share_name = `tab{doctype}`.name
-            AND ds.user = '{user}'
-        )
+        for name in pending:
+            results[(user, doctype, name)] = name in permitted
+
+    return {name for name in names if results[(user, doctype, name)]}
+
+
+def check_permitted_names(doctype, names):
     """
+    Read permission check for a batch of records, e.g. a list selection: one
+    doctype-level check plus one query for every record, instead of one
+    has_permission (and document load) per name.
+    """
+    frappe.has_permission(doctype, "read", throw=True)
+    denied = set(names) - get_permitted_names(doctype, names)
+    if denied:
+        frappe.throw(
+            frappe._("Not permitted to read {0}: {1}").format(
+                frappe._(doctype), ", ".join(sorted(denied))
+            ),
+            frappe.PermissionError,
+        )
+
 
-    # Restrict access if the user does not have any allowed role
-    return f"({assigned_condition} OR {shared_condition})"
+def clear_permission_cache(doc=None, method=None):
+    """Forget request-level permission results, e.g. after a share or assignment."""
+    frappe.local.recruitment_permission_cache = {}
 
 
 def has_permission(doc, user):
@@ -92,14 +145,4 @@ def has_permission(doc, user):
     if doc.is_new():
         return True
 
-    condition = permission_query_condition(user,doc.doctype) or "1=1"
-
-    query = f"""
-        SELECT name 
-        FROM `tab{doc.doctype}`
-        WHERE ({condition}) AND name = %s
-    """
-    
-    doc_list = frappe.db.sql(query, (doc.name,))
-    
-    return bool(doc_list)
+    return doc.name in get_permitted_names(doc.doctype, [doc.name], user)
@@ -6,6 +6,25 @@ frappe.ui.form.off('Interview', 'show_feedback_dialog')
 frappe.ui.form.off('Interview', 'get_fields_for_feedback')
 frappe.ui.form.off("Interview", "show_reschedule_dialog")
 frappe.ui.form.on("Interview", {
+    on_submit: function(frm) {
+        // The evaluation PDF is attached to the Job Applicant in the background
+        const job_id = `recruitment_pdf::interview_evaluation::${frm.doc.name}`;
+        const on_render = function(data) {
+            if (data.job_id !== job_id || data.status === "Started") {
+                return;
+            }
+            frappe.realtime.off("recruitment_pdf_render", on_render);
+            if (data.status === "Completed") {
+                frappe.show_alert({
+                    message: __("Interview Evaluation PDF attached to Job Applicant {0}", [frm.doc.job_applicant]),
+                    indicator: "green"
+                });
+            } else {
+                frappe.msgprint(__("Could not generate the Interview Evaluation PDF. Please check the Error Log."));
+            }
+        };
+        frappe.realtime.on("recruitment_pdf_render", on_render);
+    },
     refresh: function(frm) {
         if (frm.doc.status == 'On Hold') {
             frm.set_df_property('status', 'allow_on_submit', 1)
@@ -52,19 +71,12 @@ frappe.ui.form.on("Interview", {
                 __("Actions"),
             );
         }
-        const has_submitted_feedback = await frappe.db.get_value(
-            "Interview Feedback", {
-                interviewer: frappe.session.user,
+        const feedback_status = await frappe.xcall(
+            "recruitment.backend_code.interview_feedback.interview_feedback.get_interview_feedback_status", {
                 interview: frm.doc.name,
-                interview_round: frm.doc.interview_round,
-                docstatus: [
-                    "!=", 2
-                ]
-            },
-            "name",
+            }
         );
-        console.log(has_submitted_feedback.message?.name)
-        if (has_submitted_feedback.message?.name) return;
+        if (feedback_status.recorded.includes(frappe.session.user)) return;
         const allow_feedback_submission = frm.doc.interview_details.some(
             (interviewer) => interviewer.interviewer === frappe.session.user,
         );
@@ -198,28 +210,37 @@ frappe.ui.form.on("Interview", {
         });
     },
     handle_interview_evaluation_form_action: function(frm, action) {
+        // Render the form on the PDF queue and open the attached file once it is ready
         frappe.call({
-            method: "recruitment.backend_code.interview.interview.make_interview_evaluation_form",
+            method: "recruitment.backend_code.interview.interview.enqueue_interview_evaluation_form",
             args: {
                 source_name: frm.doc.name,
             },
             callback: function(r) {
-                const byteCharacters = atob(r.message); // Decode base64
-                const byteNumbers = new Array(byteCharacters.length);
-                for (let i = 0; i < byteCharacters.length; i++) {
-                    byteNumbers[i] = byteCharacters.charCodeAt(i);
+                if (!r.message) {
+                    return;
                 }
-                const byteArray = new Uint8Array(byteNumbers);
-                const blob = new Blob([byteArray], {
-                    type: "application/pdf"
+                frappe.show_alert({
+                    message: __("Generating Interview Evaluation Form..."),
+                    indicator: "blue"
                 });
-                // Create a download link
-                const link = document.createElement("a");
-                link.href = window.URL.createObjectURL(blob);
-                link.download = `interview_feedback_${frm.doc.name}.pdf`;
-                link.click();
-                // Clean up the URL object
-                window.URL.revokeObjectURL(link.href);
+                const on_render = function(data) {
+                    if (data.job_id !== r.message.job_id || data.status === "Started") {
+                        return;
+                    }
+                    frappe.realtime.off("recruitment_pdf_render", on_render);
+                    if (data.status !== "Completed") {
+                        frappe.msgprint(__("Could not generate the Interview Evaluation Form. Please check the Error Log."));
+                        return;
+                    }
+                    // Create a download link
+                    const link = document.createElement("a");
+                    link.href = data.result.file_url;
+                    link.download = `interview_feedback_${frm.doc.name}.pdf`;
+                    link.click();
+                    frm.reload_doc();
+                };
+                frappe.realtime.on("recruitment_pdf_render", on_render);
             }
         });
     },
@@ -8,31 +8,22 @@ frappe.ui.form.on("Job Applicant", {
         if (frm.is_new()) {
             frappe.validated = false;
             frappe.call({
-                method: "frappe.client.get_value",
+                method: "recruitment.backend_code.dedupe_key.dedupe_key.get_job_applicant_duplicates",
                 args: {
-                    doctype: "Job Applicant",
-                    filters: {
-                        designation: frm.doc.designation,
-                        custom_department: frm.doc.custom_department,
-                        email_id: frm.doc.email_id,
-                        custom_hiring_company: frm.doc.custom_hiring_company,
-                        job_title: frm.doc.job_title,
-                        status: ['in', [
-                            'Not Shortlisted',
-                            'R1 Rejected',
-                            'R2 Rejected',
-                            'R3 Rejected',
-                            'Final Rejected',
-                            'No Show',
-                            'Candidate Backed Out'
-                        ]]
-                    },
-                    fieldname: "name"
+                    doc: frm.doc
                 },
                 callback: function(response) {
-                    if (response.message && response.message.name) {
+                    const duplicates = response.message || {};
+                    const message = `A Job Applicant for <b>${frm.doc.designation}</b> with Hiring Company <b>${frm.doc.custom_hiring_company}</b> in Department <b>${frm.doc.custom_department}</b> already exists.`;
+                    if (duplicates.hard && duplicates.hard.length) {
+                        frappe.msgprint({
+                            title: __("Duplicate Job Applicant"),
+                            message: message,
+                            indicator: "red"
+                        });
+                    } else if (duplicates.soft && duplicates.soft.length) {
                         frappe.confirm(
-                            `A Job Applicant for <b>${frm.doc.designation}</b> with Hiring Company <b>${frm.doc.custom_hiring_company}</b> in Department <b>${frm.doc.custom_department}</b> already exists.<br><br>Do you still want to save this record?`,
+                            `${message}<br><br>Do you still want to save this record?`,
                             function() {
                                 frm.skip_duplicate_check = true; 
                                 frm.save(); 
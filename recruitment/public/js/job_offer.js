@@ -87,6 +87,14 @@ frappe.ui.form.on("Job Offer", {
                 frappe.set_route("Form", "Employee", frm.doc.__onload.employee);
             });
         }
+        if (!frm.doc.__islocal && frm.doc.custom_salary_structure) {
+            frm.add_custom_button(__("CTC Band"), function() {
+                frm.events.show_ctc_band_dialog(frm);
+            }, __("Actions"));
+            frm.add_custom_button(__("CTC From Take Home"), function() {
+                frm.events.show_ctc_solver_dialog(frm);
+            }, __("Actions"));
+        }
         if (frappe.user.has_role("HR OPS User") && frm.doc.workflow_state == 'Approved') {
             frm.set_df_property("custom_salary_structure", "allow_on_submit", 1)
         }
@@ -165,6 +173,57 @@ frappe.ui.form.on("Job Offer", {
         }
     },
     handle_job_offer_action: function(frm, action) {
+        if (action !== "Download Job Offer") {
+            frm.events.fetch_job_offer_document(frm, action);
+            return;
+        }
+        // Render the PDF on the PDF queue and download it once it is ready
+        frappe.call({
+            method: 'recruitment.backend_code.job_offer.job_offer.enqueue_job_offer_pdf',
+            args: {
+                docname: frm.doc.name,
+                action: action
+            },
+            callback: function(r) {
+                if (!r.message) {
+                    return;
+                }
+                if (r.message.status === "Ready") {
+                    frm.events.fetch_job_offer_document(frm, action);
+                    return;
+                }
+                frappe.show_alert({
+                    message: __("Generating Job Offer PDF..."),
+                    indicator: "blue"
+                });
+                const on_render = function(data) {
+                    if (data.job_id !== r.message.job_id || data.status === "Started") {
+                        return;
+                    }
+                    frappe.realtime.off("recruitment_pdf_render", on_render);
+                    if (data.status === "Completed") {
+                        frm.events.fetch_job_offer_document(frm, action);
+                    } else {
+                        frappe.msgprint(__("Could not generate the Job Offer PDF. Please check the Error Log."));
+                    }
+                };
+                frappe.realtime.on("recruitment_pdf_render", on_render);
+            }
+        });
+    },
+    fetch_job_offer_document: function(frm, action) {
+        if (action === "Download Job Offer") {
+            // The PDF is streamed as a file download, so navigating to it keeps
+            // the form open and is not caught by popup blockers
+            window.location.href = frappe.urllib.get_full_url(
+                "/api/method/recruitment.backend_code.job_offer.job_offer.download_job_offer_pdf?" +
+                $.param({
+                    docname: frm.doc.name,
+                    action: action
+                })
+            );
+            return;
+        }
         frm.call({
             method: 'recruitment.backend_code.job_offer.job_offer.download_job_offer_pdf',
             args: {
@@ -176,18 +235,97 @@ frappe.ui.form.on("Job Offer", {
                     if (action === "Preview Job Offer") {
                         var new_window = window.open();
                         new_window.document.write(r.message);
-                    } else if (action === "Download Job Offer") {
-                        const pdfBase64 = r.message.pdf_base64;
-                        const filename = r.message.filename;
-                        const link = document.createElement('a');
-                        link.href = `data:application/pdf;base64,${pdfBase64}`;
-                        link.download = filename;
-                        link.click();
                     }
                 }
             }
         });
     },
+    show_ctc_band_dialog: function(frm) {
+        const ctc = flt(frm.doc.custom_fixed_ctc);
+        let d = new frappe.ui.Dialog({
+            title: __("CTC Band"),
+            fields: [{
+                    label: __("CTC Values"),
+                    fieldname: "ctc_values",
+                    fieldtype: "Small Text",
+                    reqd: 1,
+                    description: __("Comma separated yearly CTC values"),
+                    default: [0.9, 1, 1.1].map(factor => Math.round(ctc * factor)).join(", "),
+                },
+                {
+                    fieldname: "band_html",
+                    fieldtype: "HTML",
+                }
+            ],
+            size: "large",
+            primary_action_label: __("Simulate"),
+            primary_action(values) {
+                frappe.call({
+                    method: "recruitment.backend_code.job_offer.job_offer.simulate_ctc_band",
+                    args: {
+                        salary_structure: frm.doc.custom_salary_structure,
+                        ctc_values: values.ctc_values.split(",").map(value => flt(value)).filter(value => value),
+                        pf_types: [frm.doc.custom_pf_type],
+                        pt_states: [frm.doc.custom_stateprovince_for_pt],
+                        custom_additional_pf: frm.doc.custom_addtional_pf,
+                    },
+                    callback: function(r) {
+                        const rows = (r.message || []).map(row => `
+                            <tr>
+                                <td>${format_currency(row.ctc)}</td>
+                                <td>${format_currency(row.total_earnings)}</td>
+                                <td>${format_currency(row.total_deductions)}</td>
+                                <td>${format_currency(row.total_earnings - row.total_deductions)}</td>
+                            </tr>`).join("");
+                        d.fields_dict.band_html.$wrapper.html(`
+                            <table class="table table-bordered">
+                                <thead>
+                                    <tr>
+                                        <th>${__("CTC")}</th>
+                                        <th>${__("Monthly Earnings")}</th>
+                                        <th>${__("Monthly Deductions")}</th>
+                                        <th>${__("Monthly Net")}</th>
+                                    </tr>
+                                </thead>
+                                <tbody>${rows}</tbody>
+                            </table>`);
+                    }
+                });
+            },
+        });
+        d.show();
+    },
+    show_ctc_solver_dialog: function(frm) {
+        frappe.prompt([{
+            label: __("Target Monthly Take Home"),
+            fieldname: "target_take_home",
+            fieldtype: "Currency",
+            reqd: 1,
+        }], function(values) {
+            frappe.call({
+                method: "recruitment.backend_code.job_offer.job_offer.solve_ctc_for_take_home",
+                args: {
+                    salary_structure: frm.doc.custom_salary_structure,
+                    target_take_home: values.target_take_home,
+                    custom_pf_type: frm.doc.custom_pf_type,
+                    custom_additional_pf: frm.doc.custom_addtional_pf,
+                    custom_stateprovince_for_pt: frm.doc.custom_stateprovince_for_pt,
+                    gratuity: frm.doc.custom_gratuity,
+                    nps: frm.doc.custom_nps,
+                },
+                callback: function(r) {
+                    if (!r.message) return;
+                    if (frm.doc.docstatus === 0) {
+                        frm.set_value("custom_fixed_ctc", r.message.ctc);
+                    }
+                    frappe.msgprint(__("A fixed CTC of {0} gives a monthly take home of {1}.", [
+                        format_currency(r.message.ctc),
+                        format_currency(r.message.take_home)
+                    ]));
+                }
+            });
+        }, __("CTC From Take Home"), __("Calculate"));
+    },
     status: function(frm) {
         if (frm.doc.status === "Offer Accepted") {
             frappe.confirm(
@@ -0,0 +1,69 @@
+// Extend the standard Job Offer list settings with bulk offer letter generation
+const job_offer_list_settings = frappe.listview_settings["Job Offer"] || {};
+const standard_job_offer_onload = job_offer_list_settings.onload;
+
+frappe.listview_settings["Job Offer"] = Object.assign(job_offer_list_settings, {
+    onload: function(listview) {
+        if (standard_job_offer_onload) {
+            standard_job_offer_onload(listview);
+        }
+        listview.page.add_actions_menu_item(__("Generate Offer Letters"), function() {
+            const docnames = listview.get_checked_items(true);
+            if (!docnames.length) {
+                frappe.msgprint(__("Please select at least one Job Offer"));
+                return;
+            }
+            frappe.prompt([{
+                    label: __("Send to Applicants"),
+                    fieldname: "send_email",
+                    fieldtype: "Check",
+                    description: __("Mail each offer letter to its applicant"),
+                }],
+                function(values) {
+                    frappe.call({
+                        method: "recruitment.backend_code.bulk_job_offer.bulk_job_offer.bulk_generate_job_offers",
+                        args: {
+                            docnames: docnames,
+                            send_email: values.send_email,
+                        },
+                        callback: function(r) {
+                            if (r.message) {
+                                track_bulk_job_offer_run(r.message.run_id, r.message.total);
+                            }
+                        }
+                    });
+                },
+                __("Generate Offer Letters for {0} Job Offers", [docnames.length]),
+                __("Generate")
+            );
+        });
+    },
+});
+
+function track_bulk_job_offer_run(run_id, total) {
+    const title = __("Generating Offer Letters");
+    frappe.show_progress(title, 0, total, __("Queued"));
+    const on_progress = function(data) {
+        if (data.run_id !== run_id) {
+            return;
+        }
+        frappe.show_progress(title, data.processed, data.total, __("{0} of {1} done", [data.processed, data.total]));
+        if (!data.completed) {
+            return;
+        }
+        frappe.realtime.off("recruitment_bulk_job_offer", on_progress);
+        frappe.hide_progress();
+        let message = __("Offer letters are ready: {0}", [
+            `<a href="${data.file_url}" target="_blank">${__("Download ZIP")}</a>`
+        ]);
+        if (data.failed.length) {
+            message += "<br><br>" + __("Failed (see Error Log): {0}", [data.failed.join(", ")]);
+        }
+        frappe.msgprint({
+            title: __("Offer Letters Generated"),
+            message: message,
+            indicator: data.failed.length ? "orange" : "green",
+        });
+    };
+    frappe.realtime.on("recruitment_bulk_job_offer", on_progress);
+}
@@ -0,0 +1,17 @@
+# Copyright (c) 2026, Mantra and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class RecruiterDailyMetric(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique(
+		"Recruiter Daily Metric",
+		["recruiter", "metric_date"],
+		constraint_name="unique_recruiter_metric_date",
+	)
@@ -0,0 +1,17 @@
+# Copyright (c) 2026, Mantra and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class RecruitmentAccess(Document):
+	pass
+
+
+def on_doctype_update():
+	# Permission conditions probe by user and doctype, sync replaces by document
+	frappe.db.add_index(
+		"Recruitment Access", ["user", "reference_doctype", "reference_name"]
+	)
+	frappe.db.add_index("Recruitment Access", ["reference_doctype", "reference_name"])
@@ -1,10 +1,34 @@
 # Copyright (c) 2025, Foram Shah and contributors
 # For license information, please see license.txt
 
+import csv
+import gzip
+import io
+from itertools import groupby
+
 import frappe
-from frappe.utils import nowdate, getdate
+from frappe.utils import cstr, escape_html, nowdate, getdate
 from datetime import timedelta, datetime
 from frappe.model.document import Document
+from recruitment.backend_code.outbound_mail.outbound_mail import send_mail
+
+# Applicant columns of the open status digest
+OPEN_STATUS_COLUMNS = (
+    ("Position", "custom_position"),
+    ("Name", "applicant_name"),
+    ("Contact", "phone_number"),
+    ("Email", "email_id"),
+    ("Education", "custom_education"),
+    ("Current Org", "custom_current_company"),
+    ("Experience", "custom_total_experiencein_years"),
+    ("CTC", "custom_current_ctc"),
+    ("ECTC", "custom_expected_ctc"),
+    ("Notice Period", "custom_notice_period"),
+    ("Current Location", "custom_current_location"),
+    ("Remark", "custom_remark"),
+)
+# Digests with more applicants than this go out as a gzipped CSV attachment
+OPEN_STATUS_INLINE_ROWS = 200
 
 
 class RecruitmentSetting(Document):
@@ -46,108 +70,87 @@ def send_open_status_email():
     cutoff_date = datetime.combine(
         current_date - timedelta(days=reminder_days), datetime.min.time()
     )
-    # Fetch Job Applicants who are still 'Profile Under Review' after the cutoff date
-    job_openings = frappe.get_all(
-        "Job Opening",
-        filters={"status": "Open"},
-        fields=[
-            "name",
-            "department",
-            "custom_hiring_manager",
-            "custom_head_of_department",
-        ],
-    )
-    if not job_openings:
-        return  # No open job
-    applicants = frappe.get_all(
-        "Job Applicant",
-        filters={
-            "status": "Profile Under Review",
-        },
-        fields=["*"],
+    # Fetch Job Applicants who are still 'Profile Under Review' after the cutoff
+    # date, for every open Job Opening, in one query grouped by opening
+    applicants = frappe.db.sql(
+        """
+        SELECT
+            jo.name AS job_opening,
+            jo.job_title AS job_opening_title,
+            jo.custom_head_of_department,
+            jo.custom_hiring_manager,
+            {columns}
+        FROM `tabJob Opening` jo
+        INNER JOIN `tabJob Applicant` ja ON ja.job_title = jo.name
+        WHERE jo.status = 'Open'
+            AND ja.status = 'Profile Under Review'
+            AND ja.creation >= %(cutoff_date)s
+        ORDER BY jo.name, ja.creation
+        """.format(
+            columns=", ".join(f"ja.{fieldname}" for _label, fieldname in OPEN_STATUS_COLUMNS)
+        ),
+        {"cutoff_date": cutoff_date},
+        as_dict=True,
     )
-
     if not applicants:
         return  # No pending applicants; no email needed
 
-    for job in job_openings:
-        # Fetch Job Applicants linked to this Job Opening
-        applicants = frappe.get_all(
-            "Job Applicant",
-            filters={
-                "status": "Profile Under Review",
-                "creation": [">=", cutoff_date],
-                "job_title": job.name,  # Match with the Job Opening
-            },
-            fields=["*"],
+    # Merge every opening into one digest per HOD / Hiring Manager
+    openings_by_recipient = {}
+    for job_opening, rows in groupby(applicants, key=lambda row: row.job_opening):
+        rows = list(rows)
+        for recipient in {rows[0].custom_head_of_department, rows[0].custom_hiring_manager}:
+            if recipient:
+                openings_by_recipient.setdefault(recipient, []).append(rows)
+
+    full_names = dict(
+        frappe.get_all(
+            "User",
+            filters={"name": ["in", list(openings_by_recipient)]},
+            fields=["name", "full_name"],
+            as_list=True,
         )
-        if not applicants:
-            continue
-
-        # Generate the HTML table for email
-        applicant_table_html = """
-        <table style="border-collapse: collapse; width: 100%; margin-top: 20px;">
-            <thead>
-                <tr>
-                    <th style="text-align: left; background-color: #E6F2A2;">Position</th>
-                    <th style="text-align: left; background-color: #E6F2A2;">Name</th>
-                    <th style="text-align: left; background-color: #E6F2A2;">Contact</th>
-                    <th style="text-align: left; background-color: #E6F2A2;">Email</th>
-                    <th style="text-align: left; background-color: #E6F2A2;">Education</th>
-                    <th style="text-align: left; background-color: #E6F2A2;">Currnent Org</th>
-                    <th style="text-align: left; background-color: #E6F2A2;">Experience</th>
-                    <th style="text-align: left; background-color: #E6F2A2;">CTC</th>
-                    <th style="text-align: left; background-color: #E6F2A2;">ECTC</th>
-                    <th style="text-align: left; background-color: #E6F2A2;">Notice Period</th>
-                    <th style="text-align: left; background-color: #E6F2A2;">Current Location</th>
-                    <th style="text-align: left; background-color: #E6F2A2;">Remark</th>
-                    
-                </tr>
-            </thead>
-            <tbody>
-        """
-
-        for applicant in applicants:
-            applicant_table_html += f"""
-            <tr>
-                <td>{applicant.custom_position}</td>
-                <td>{applicant.applicant_name}</td>
-                <td>{applicant.phone_number}</td>
-                <td>{applicant.email_id}</td>
-                <td>{applicant.custom_education}</td>
-                <td>{applicant.custom_current_company}</td>
-                <td>{applicant.custom_total_experiencein_years}</td>
-                <td>{applicant.custom_current_ctc}</td> 
-                <td>{applicant.custom_expected_ctc}</td>
-                <td>{applicant.custom_notice_period}</td>
-                <td>{applicant.custom_current_location}</td>
-                <td>{applicant.Remark}</td>
-
-            </tr>
-            """
-
-        applicant_table_html += "</tbody></table>"
-        recipients = []
-
-        # Add HOD Manager from Job Opening
-        if job.custom_head_of_department:
-            recipients.append(job.custom_head_of_department)
+    )
+    for recipient, openings in openings_by_recipient.items():
+        send_open_status_digest(recipient, full_names.get(recipient) or recipient, openings)
 
-        # Add Hiring Manager from Job Opening
-        if job.custom_hiring_manager:
-            recipients.append(job.custom_hiring_manager)
 
-        # Fetch all HR Managers' emails
-        for hr_email in recipients:
-            hr_manager_name = frappe.get_value("User", hr_email, "full_name")
+def send_open_status_digest(recipient, recipient_name, openings):
+    """
+    Mails one recipient the pending applicants of all their open Job Openings.
+    Digests above OPEN_STATUS_INLINE_ROWS applicants list only the count per
+    opening and carry the applicants as a gzipped CSV attachment.
+    """
+    applicant_count = sum(len(rows) for rows in openings)
+    attachments = None
+    if applicant_count > OPEN_STATUS_INLINE_ROWS:
+        summary = "".join(
+            f"<tr><td>{escape_html(get_opening_label(rows[0]))}</td><td>{len(rows)}</td></tr>"
+            for rows in openings
+        )
+        body = f"""
+                    <p>{applicant_count} profiles are awaiting review. The full list is attached as a CSV file.</p>
+                    <table style="border-collapse: collapse; margin-top: 20px;">
+                        <thead><tr><th>Job Opening</th><th>Profiles</th></tr></thead>
+                        <tbody>{summary}</tbody>
+                    </table>
+        """
+        attachments = [
+            {
+                "fname": f"profiles_under_review_{nowdate()}.csv.gz",
+                "fcontent": get_open_status_csv(openings),
+            }
+        ]
+    else:
+        body = f"""
+                    <p>Please find below resources:</p>
+                    {get_open_status_table(openings)}
+        """
 
-            # Prepare email content
-            subject = "Reminder for Shortlisting Process"
-            message = f"""
+    message = f"""
             <html>
                 <head>
                     <style>
-                       
                         th, td {{
                             padding: 8px;
                             text-align: left;
@@ -158,18 +161,55 @@ def send_open_status_email():
                     </style>
                 </head>
                 <body>
-                    <p>Dear {hr_manager_name},</p>
+                    <p>Dear {recipient_name},</p>
                     <p>Greetings of the day..!!</p>
-                    <p>Please find below resources:</p>
-                    {applicant_table_html}
+                    {body}
                 </body>
             </html>
             """
+    send_mail(
+        "Open Job Status",
+        recipients=[recipient],
+        subject="Reminder for Shortlisting Process",
+        message=message,
+        attachments=attachments,
+    )
 
-            # Send an individual email to each HR manager
-            frappe.sendmail(
-                recipients=[hr_email],  # Send to one person at a time
-                subject=subject,
-                message=message,
-                now=True,
+
+def get_opening_label(row):
+    return f"{row.job_opening_title} ({row.job_opening})" if row.job_opening_title else row.job_opening
+
+
+def get_open_status_table(openings):
+    """HTML table of the applicants, with a heading row per Job Opening."""
+    header = "".join(f"<th>{label}</th>" for label, _fieldname in OPEN_STATUS_COLUMNS)
+    parts = [
+        '<table style="border-collapse: collapse; width: 100%; margin-top: 20px;">',
+        f"<thead><tr>{header}</tr></thead><tbody>",
+    ]
+    for rows in openings:
+        parts.append(
+            f'<tr><td colspan="{len(OPEN_STATUS_COLUMNS)}"><b>{escape_html(get_opening_label(rows[0]))}</b></td></tr>'
+        )
+        for row in rows:
+            cells = "".join(
+                f"<td>{escape_html(cstr(row[fieldname]))}</td>"
+                for _label, fieldname in OPEN_STATUS_COLUMNS
+            )
+            parts.append(f"<tr>{cells}</tr>")
+    parts.append("</tbody></table>")
+    return "".join(parts)
+
+
+def get_open_status_csv(openings):
+    """Gzipped CSV of the applicants, one row per applicant."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["Job Opening"] + [label for label, _fieldname in OPEN_STATUS_COLUMNS])
+    for rows in openings:
+        for row in rows:
+            writer.writerow(
+                [row.job_opening]
+                + [cstr(row[fieldname]) for _label, fieldname in OPEN_STATUS_COLUMNS]
             )
+    return gzip.compress(buffer.getvalue().encode("utf-8"))